@@ -0,0 +1,109 @@
+# benchmarks/embedding_benchmark.py
+#
+# Usage:
+#   python -m benchmarks.embedding_benchmark data/processed/AIDS_And_HIV_Infection.txt --queries 100
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from embeddings.backends import ONNXEmbeddingBackend, OpenAIEmbeddingBackend
+from embeddings.embedder import Embedder
+from embeddings.quantization import dequantize_int8, quantize_int8, truncate
+from ingestion.chunker import TextChunker
+from config.settings import EMBEDDING_BACKEND
+
+
+def embed_corpus(texts: List[str]) -> np.ndarray:
+    """
+    Full-dimension embeddings; shorter variants are derived by truncation,
+    which matches what text-embedding-3 returns for `dimensions`.
+    """
+    if EMBEDDING_BACKEND == "onnx":
+        backend = ONNXEmbeddingBackend(dimensions=None)
+    else:
+        backend = OpenAIEmbeddingBackend(dimensions=None)
+
+    return Embedder(backend=backend).embed_texts(texts)
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def benchmark_setting(
+    corpus: np.ndarray,
+    query_ids: np.ndarray,
+    truth: np.ndarray,
+    dimensions: Optional[int],
+    dtype: str,
+    k: int,
+) -> dict:
+    vectors = truncate(corpus, dimensions)
+    bytes_per_vector = vectors.shape[1] * 4
+
+    if dtype == "int8":
+        codes, scales = quantize_int8(vectors)
+        vectors = dequantize_int8(codes, scales)
+        bytes_per_vector = vectors.shape[1] + 4
+
+    found = top_k(vectors[query_ids], vectors, k)
+    recall = np.mean([
+        len(set(a) & set(b)) / k for a, b in zip(found, truth)
+    ])
+
+    return {
+        "dimensions": vectors.shape[1],
+        "dtype": dtype,
+        "bytes_per_vector": bytes_per_vector,
+        "index_mb": bytes_per_vector * len(vectors) / (1024 * 1024),
+        "recall": recall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recall@k vs. storage size for reduced/quantized embeddings."
+    )
+    parser.add_argument("file", type=Path, help="Cleaned text file to chunk and embed")
+    parser.add_argument("--queries", type=int, default=100,
+                        help="Number of chunks used as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dimensions", type=int, nargs="+",
+                        default=[1024, 768, 512, 256])
+    args = parser.parse_args()
+
+    texts = [c["text"] for c in TextChunker().chunk(args.file)]
+    if len(texts) <= args.k:
+        raise SystemExit(f"Need more than {args.k} chunks, got {len(texts)}")
+
+    corpus = embed_corpus(texts)
+    rng = np.random.default_rng(0)
+    query_ids = rng.choice(len(texts), min(args.queries, len(texts)), replace=False)
+
+    # Ground truth: exact search at full dimension and precision
+    truth = top_k(corpus[query_ids], corpus, args.k)
+
+    print(f"{len(texts)} chunks, {len(query_ids)} queries, recall@{args.k}\n")
+    print(f"{'dims':>6}{'dtype':>9}{'bytes/vec':>11}{'index MB':>10}{'recall':>8}")
+
+    settings = [None] + [d for d in args.dimensions if d < corpus.shape[1]]
+    for dimensions in settings:
+        for dtype in ("float32", "int8"):
+            result = benchmark_setting(
+                corpus, query_ids, truth, dimensions, dtype, args.k
+            )
+            print(
+                f"{result['dimensions']:>6}"
+                f"{result['dtype']:>9}"
+                f"{result['bytes_per_vector']:>11}"
+                f"{result['index_mb']:>10.2f}"
+                f"{result['recall']:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
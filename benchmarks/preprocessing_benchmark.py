@@ -0,0 +1,82 @@
+# benchmarks/preprocessing_benchmark.py
+#
+# Usage:
+#   python -m benchmarks.preprocessing_benchmark data/files/AIDS_And_HIV_Infection.pdf --pages 5
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+
+from ingestion.image_preprocessor import ImagePreprocessor
+from ingestion.pdf_rasterizer import PDFRasterizer
+
+
+def load_pages(file_path: Path, max_pages: int) -> List[Image.Image]:
+    if file_path.suffix.lower() == ".pdf":
+        rasterizer = PDFRasterizer()
+        count = min(rasterizer.page_count(file_path), max_pages)
+        return list(rasterizer.iter_pages(file_path, range(count)))
+
+    return [Image.open(file_path).convert("RGB")]
+
+
+def benchmark_profile(profile: str, pages: List[Image.Image], repeat: int) -> dict:
+    """
+    Time each page and record the peak of numpy/OpenCV output allocations
+    (tracked through tracemalloc) while it is processed.
+    """
+    preprocessor = ImagePreprocessor(profile=profile)
+    timings = []
+    peak_bytes = 0
+
+    # Warm-up so one-off initialisation is not counted
+    preprocessor.preprocess(pages[0])
+
+    for _ in range(repeat):
+        for page in pages:
+            tracemalloc.start()
+            start = time.perf_counter()
+            preprocessor.preprocess(page)
+            timings.append(time.perf_counter() - start)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_bytes = max(peak_bytes, peak)
+
+    timings.sort()
+    return {
+        "profile": profile,
+        "ms_per_page": 1000 * sum(timings) / len(timings),
+        "p95_ms": 1000 * timings[int(0.95 * (len(timings) - 1))],
+        "peak_mb": peak_bytes / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare ImagePreprocessor profiles (ms/page and peak memory)."
+    )
+    parser.add_argument("file", type=Path, help="PDF or image to preprocess")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.file, args.pages)
+    print(f"{len(pages)} page(s) from {args.file}, {args.repeat} repeat(s)\n")
+    print(f"{'profile':<10}{'ms/page':>10}{'p95 ms':>10}{'peak MB':>10}")
+
+    for profile in ImagePreprocessor.PROFILES:
+        result = benchmark_profile(profile, pages, args.repeat)
+        print(
+            f"{result['profile']:<10}"
+            f"{result['ms_per_page']:>10.1f}"
+            f"{result['p95_ms']:>10.1f}"
+            f"{result['peak_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# clients/factory.py
+
+import importlib.util
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+)
+
+from config.settings import (
+    OPENAI_API_KEY,
+    DEEPSEEK_API_KEY,
+    DEEPINFRA_BASE_URL,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_READ_TIMEOUT_SECONDS,
+    HTTP_WRITE_TIMEOUT_SECONDS,
+    HTTP_POOL_TIMEOUT_SECONDS,
+    HTTP_HTTP2,
+)
+
+
+# provider -> (api key, base url)
+PROVIDERS = {
+    "openai": (OPENAI_API_KEY, None),
+    "deepinfra": (DEEPSEEK_API_KEY, DEEPINFRA_BASE_URL),
+}
+
+_lock = threading.Lock()
+_clients: Dict[str, OpenAI] = {}
+_async_clients: Dict[str, AsyncOpenAI] = {}
+_stats: Dict[str, "_PoolStats"] = {}
+
+
+class _PoolStats:
+    """
+    Request counters for one provider, fed by httpx event hooks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.http_versions: Dict[str, int] = {}
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def on_response(self, response: httpx.Response) -> None:
+        with self._lock:
+            self.responses += 1
+            if response.status_code >= 400:
+                self.errors += 1
+            version = response.http_version
+            self.http_versions[version] = self.http_versions.get(version, 0) + 1
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        self.on_request(request)
+
+    async def on_response_async(self, response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "responses": self.responses,
+                "errors": self.errors,
+                "http_versions": dict(self.http_versions),
+            }
+
+
+def _http2_enabled() -> bool:
+    return HTTP_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT_SECONDS,
+        read=HTTP_READ_TIMEOUT_SECONDS,
+        write=HTTP_WRITE_TIMEOUT_SECONDS,
+        pool=HTTP_POOL_TIMEOUT_SECONDS,
+    )
+
+
+def _http_options() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": _timeout(),
+        "http2": _http2_enabled(),
+    }
+
+
+def _provider(name: str):
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown API provider: {name}")
+    if name not in _stats:
+        _stats[name] = _PoolStats()
+    return PROVIDERS[name]
+
+
+def get_client(provider: str = "openai") -> OpenAI:
+    """
+    Process-wide OpenAI-compatible client for `provider`, created on first
+    use. All callers share its keep-alive connection pool.
+    """
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+
+    with _lock:
+        if provider not in _clients:
+            api_key, base_url = _provider(provider)
+            stats = _stats[provider]
+
+            _clients[provider] = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                # Also set on the SDK client, which applies it per request
+                timeout=_timeout(),
+                http_client=DefaultHttpxClient(
+                    event_hooks={
+                        "request": [stats.on_request],
+                        "response": [stats.on_response],
+                    },
+                    **_http_options(),
+                ),
+            )
+
+        return _clients[provider]
+
+
+def get_async_client(provider: str = "openai") -> AsyncOpenAI:
+    """
+    Async variant of `get_client`. The underlying connection pool is bound
+    to the event loop it is first used in.
+    """
+    client = _async_clients.get(provider)
+    if client is not None:
+        return client
+
+    with _lock:
+        if provider not in _async_clients:
+            api_key, base_url = _provider(provider)
+            stats = _stats[provider]
+
+            _async_clients[provider] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                # Also set on the SDK client, which applies it per request
+                timeout=_timeout(),
+                http_client=DefaultAsyncHttpxClient(
+                    event_hooks={
+                        "request": [stats.on_request_async],
+                        "response": [stats.on_response_async],
+                    },
+                    **_http_options(),
+                ),
+            )
+
+        return _async_clients[provider]
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Whether a failed API call may succeed if retried: connection errors,
+    timeouts, rate limits and server errors. Anything else (bad requests,
+    authentication, local bugs) fails the same way every time.
+    """
+    # APIConnectionError includes APITimeoutError
+    if isinstance(error, (APIConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _connection_counts(http_client) -> Optional[dict]:
+    """
+    Open/idle connections of an httpx client's pool (httpcore internals,
+    so None if they are not available).
+    """
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return None
+
+    return {
+        "open": len(connections),
+        "idle": sum(1 for c in connections if c.is_idle()),
+    }
+
+
+def pool_stats() -> Dict[str, dict]:
+    """
+    Per-provider request counters and current pool occupancy.
+    """
+    with _lock:
+        stats = {}
+        for provider, counters in _stats.items():
+            entry = counters.as_dict()
+            entry["http2"] = _http2_enabled()
+
+            if provider in _clients:
+                entry["connections"] = _connection_counts(
+                    _clients[provider]._client
+                )
+            if provider in _async_clients:
+                entry["async_connections"] = _connection_counts(
+                    _async_clients[provider]._client
+                )
+
+            stats[provider] = entry
+
+        return stats
@@ -95,3 +95,32 @@ Rules:
 - High-level abstraction is allowed.
 - Do not mention missing information.
 """.strip()
+
+
+
+# Ingest-time Summarizer Prompts
+
+SECTION_SUMMARY_PROMPT = """
+You are summarizing one section of a longer document.
+
+Write a compact summary of the section text provided.
+
+Rules:
+- Keep the key facts, names, figures and conclusions.
+- Do not invent facts.
+- Do not refer to "this section" or to missing context.
+- At most 150 words.
+""".strip()
+
+
+COMBINE_SUMMARY_PROMPT = """
+You are combining consecutive section summaries of one document into a
+single summary.
+
+Rules:
+- Cover the overall topic, purpose and structure, then the main points
+  in document order.
+- Use only the information in the section summaries.
+- Do not invent facts.
+- At most 250 words.
+""".strip()
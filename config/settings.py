@@ -18,6 +18,11 @@ RAW_DATA_DIR = DATA_DIR / "raw"
 OCR_DATA_DIR = DATA_DIR / "ocr"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
 CHROMA_DIR = DATA_DIR / "chroma"
+CACHE_DIR = DATA_DIR / "cache"
+MANIFEST_PATH = DATA_DIR / "manifest.sqlite3"
+# Pre-sqlite manifest, imported into MANIFEST_PATH once
+LEGACY_MANIFEST_PATH = DATA_DIR / "manifest.json"
+SUMMARY_DIR = DATA_DIR / "summaries"
 
 # Ensure directories exist
 for path in [
@@ -26,9 +31,15 @@ for path in [
     OCR_DATA_DIR,
     PROCESSED_DATA_DIR,
     CHROMA_DIR,
+    CACHE_DIR,
+    SUMMARY_DIR,
 ]:
     path.mkdir(parents=True, exist_ok=True)
 
+# How local files are brought into RAW_DATA_DIR: "copy", "hardlink"
+# (falls back to copy across filesystems) or "reference" (used in place)
+LOCAL_FILE_MODE = "copy"
+
   
 # OpenAI Configuration
   
@@ -42,11 +53,71 @@ if not OPENAI_API_KEY:
     )
 
   
+# Shared HTTP Clients
+  
+
+# One keep-alive connection pool per provider, shared by every component.
+# Keep HTTP_MAX_CONNECTIONS at or above the largest concurrency setting
+# (OCR_MAX_CONCURRENCY, EMBEDDING_MAX_CONCURRENCY) using that provider.
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+HTTP_READ_TIMEOUT_SECONDS = 120.0
+HTTP_WRITE_TIMEOUT_SECONDS = 30.0
+HTTP_POOL_TIMEOUT_SECONDS = 30.0
+
+# Negotiate HTTP/2 when the `h2` package is installed
+HTTP_HTTP2 = True
+
+  
 # Embedding Configuration
   
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 
+# "openai" or "onnx" (local CPU inference, see ONNX_MODEL_DIR). Backends
+# produce different dimensions, so each needs its own Chroma collection.
+EMBEDDING_BACKEND = "openai"
+
+# Output dimensions (None = model default, 1536 for text-embedding-3-small).
+# Passed natively to text-embedding-3 models; ONNX outputs are truncated and
+# renormalized. Changing it requires a fresh Chroma collection.
+EMBEDDING_DIMENSIONS = None
+
+# Local ONNX embedding model: directory with model.onnx and tokenizer.json
+ONNX_MODEL_DIR = BASE_DIR / "models" / "embedding"
+ONNX_BATCH_SIZE = 32
+ONNX_NUM_THREADS = os.cpu_count() or 1
+ONNX_MAX_LENGTH = 512
+
+# Tokenizer matching EMBEDDING_MODEL (cl100k_base): local tokenizer.json
+# path or Hugging Face Hub repository id
+EMBEDDING_TOKENIZER = "Xenova/text-embedding-ada-002"
+
+# Token limits are checked against UTF-8 byte counts (a token is never
+# shorter than one byte). Only inputs longer than EMBEDDING_MAX_TOKENS bytes
+# are tokenized, and truncated to EMBEDDING_MAX_TOKENS tokens if needed.
+EMBEDDING_MAX_TOKENS = 8191
+
+# Request batching: inputs are split by count and total tokens, and batches
+# are sent concurrently; failed batches are retried with exponential backoff
+EMBEDDING_MAX_BATCH_INPUTS = 2048
+EMBEDDING_MAX_BATCH_TOKENS = 250_000
+EMBEDDING_MAX_CONCURRENCY = 4
+EMBEDDING_MAX_RETRIES = 3
+EMBEDDING_RETRY_BACKOFF_SECONDS = 1.0
+
+# Persistent embedding cache (least-recently-used entries evicted past the
+# limit) and in-process LRU for query embeddings
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = CACHE_DIR / "embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# "float32" or "int8" (per-vector scalar quantization, ~4x smaller)
+EMBEDDING_CACHE_DTYPE = "float32"
+QUERY_CACHE_SIZE = 1024
+
   
 # OCR Configuration (DeepSeek)
   
@@ -58,12 +129,111 @@ if not DEEPSEEK_API_KEY:
         "DEEPSEEK_API_KEY not found. Please set it in your .env file."
     )
 
+DEEPINFRA_BASE_URL = "https://api.deepinfra.com/v1/openai"
+
+# Maximum number of pages sent to the OCR endpoint at the same time
+OCR_MAX_CONCURRENCY = 8
+
+# Per-page retries (with exponential backoff) before a page is failed
+OCR_MAX_RETRIES = 3
+OCR_RETRY_BACKOFF_SECONDS = 1.0
+
+# Page rendering for scanned PDFs ("pdfium" or "poppler")
+OCR_RASTER_BACKEND = "pdfium"
+OCR_DPI = 300
+
+# Adaptive DPI: render a low-DPI probe, estimate the x-height from connected
+# components and pick the smallest DPI (between OCR_MIN_DPI and OCR_DPI) that
+# yields OCR_TARGET_XHEIGHT_PX in the final preprocessed image
+OCR_ADAPTIVE_DPI = False
+OCR_PROBE_DPI = 100
+OCR_MIN_DPI = 100
+OCR_TARGET_XHEIGHT_PX = 20
+
+# Page preprocessing profile ("quality" or "fast")
+OCR_PREPROCESS_PROFILE = "quality"
+
+# Worker processes for page preprocessing (pages are passed through shared
+# memory). 0 or 1 preprocesses inline in the OCR threads.
+OCR_PREPROCESS_WORKERS = os.cpu_count() or 1
+
+# OCR request payload encoding: "png", "png1" (1-bit PNG for thresholded
+# pages), "webp" or "jpeg"; quality applies to the lossy formats, and pages
+# larger than OCR_IMAGE_MAX_DIMENSION (pixels, None = unlimited) are downscaled
+OCR_IMAGE_FORMAT = "png"
+OCR_IMAGE_QUALITY = 80
+OCR_IMAGE_MAX_DIMENSION = None
+
+# Persistent OCR result cache (least-recently-used entries evicted past the limit)
+OCR_CACHE_ENABLED = True
+OCR_CACHE_PATH = CACHE_DIR / "ocr_cache.sqlite3"
+OCR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Per-page PDF classification: pages with too little extractable text and
+# at least PDF_MIN_IMAGE_COVERAGE of their area in images, or mostly covered
+# by images with little text, are sent to OCR. Short pages without images
+# (blank, title or separator pages) keep their text layer.
+PDF_MIN_TEXT_CHARS = 50
+PDF_MIN_IMAGE_COVERAGE = 0.1
+PDF_SCANNED_IMAGE_COVERAGE = 0.5
+PDF_MIN_TEXT_CHARS_ON_SCANNED = 200
+
+# Text-layer extraction: "pdfplumber" or "pdfium" (pypdfium2). Documents
+# longer than PDF_EXTRACT_PAGES_PER_TASK pages are split into page ranges
+# extracted in parallel by up to PDF_EXTRACT_WORKERS processes
+PDF_EXTRACT_BACKEND = "pdfplumber"
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+PDF_EXTRACT_PAGES_PER_TASK = 32
+
+# Text-native formats (txt, md, html, docx) bypass OCR and are streamed in
+# blocks of about this many characters
+TEXT_READER_BLOCK_CHARS = 8000
+
+  
+# Batch Ingestion Pipeline
+  
+
+# Documents buffered between pipeline stages in IngestionService.ingest_many
+INGEST_QUEUE_SIZE = 4
+
+# Streaming ingestion: pages flow through OCR, cleaning and chunking as
+# generators and are embedded in batches of INGEST_STREAM_BATCH_SIZE chunks.
+# Intermediate OCR/processed text files are only written when requested.
+INGEST_STREAMING = False
+INGEST_STREAM_BATCH_SIZE = 64
+INGEST_WRITE_INTERMEDIATE = False
+
   
 # ChromaDB Configuration
   
 
 CHROMA_COLLECTION_NAME = "documents"
 
+# Give every tenant its own collection (and lexical index) instead of
+# filtering one shared collection by the chunks' "tenant" metadata
+TENANT_COLLECTIONS = False
+
+# Chunks embedded and written per upsert call (capped at the client's max
+# batch size), so memory stays bounded and each batch is committed on its own
+CHROMA_UPSERT_BATCH_SIZE = 256
+
+# Upsert batches embedded concurrently, ahead of the batch being written, on
+# a pool shared by all stores; at most this many batches are held in memory
+CHROMA_UPSERT_PIPELINE_DEPTH = 3
+
+# BM25 inverted index kept in sync with the collection (rebuilt from Chroma
+# if the file is missing or out of date)
+LEXICAL_INDEX_PATH = CHROMA_DIR / "lexical_index.sqlite3"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# "vector" (embeddings), "lexical" (BM25 only, no API call; falls back to
+# vector when no query term matches) or "hybrid" (reciprocal rank fusion
+# of RETRIEVAL_CANDIDATES results from each)
+RETRIEVAL_MODE = "vector"
+RETRIEVAL_CANDIDATES = 20
+RRF_K = 60
+
   
 # RAG Parameters
   
@@ -71,5 +241,41 @@ CHROMA_COLLECTION_NAME = "documents"
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 150
 
+# "chars" (CHUNK_SIZE/CHUNK_OVERLAP characters) or "tokens"
+# (CHUNK_SIZE_TOKENS/CHUNK_OVERLAP_TOKENS tokens of the active embedding
+# backend, capped at the longest input it embeds without truncation)
+CHUNK_MODE = "chars"
+CHUNK_SIZE_TOKENS = 512
+CHUNK_OVERLAP_TOKENS = 64
+
+# Near-duplicate chunk suppression (MinHash over word shingles with LSH).
+# Chunks whose estimated Jaccard similarity to an already stored chunk is
+# at least DEDUPE_THRESHOLD are skipped and recorded as references to it.
+DEDUPE_ENABLED = False
+DEDUPE_INDEX_PATH = CACHE_DIR / "dedupe_index.sqlite3"
+DEDUPE_THRESHOLD = 0.9
+DEDUPE_SHINGLE_SIZE = 5
+DEDUPE_NUM_PERM = 128
+DEDUPE_BANDS = 32
+
 TOP_K_RETRIEVAL = 5
 MAX_GENERATION_RETRIES = 2
+
+  
+# Document Summaries
+  
+
+# Map-reduce summaries built at ingest time: consecutive chunks are grouped
+# into sections of about SUMMARY_SECTION_CHARS characters, each section is
+# summarized, and section summaries are merged SUMMARY_FANIN at a time until
+# one document summary remains. Summary questions are answered from it.
+SUMMARIES_ENABLED = True
+SUMMARY_MODEL = OPENAI_MODEL
+SUMMARY_SECTION_CHARS = 12_000
+SUMMARY_FANIN = 8
+SUMMARY_MAX_CONCURRENCY = 4
+
+# Summary questions spanning several documents roll up their summaries:
+# beyond SUMMARY_FANIN documents they are merged SUMMARY_FANIN at a time
+# first, and beyond SUMMARY_ROLLUP_MAX_DOCUMENTS retrieval is used instead
+SUMMARY_ROLLUP_MAX_DOCUMENTS = 64
@@ -0,0 +1,253 @@
+# embeddings/backends.py
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from clients.factory import get_client
+from embeddings.quantization import normalize, truncate
+from embeddings.tokenizer import EmbeddingTokenizer
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MAX_TOKENS,
+    EMBEDDING_MAX_BATCH_INPUTS,
+    EMBEDDING_MAX_BATCH_TOKENS,
+    EMBEDDING_MAX_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_RETRY_BACKOFF_SECONDS,
+    ONNX_MODEL_DIR,
+    ONNX_BATCH_SIZE,
+    ONNX_NUM_THREADS,
+    ONNX_MAX_LENGTH,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface for embedding providers.
+
+    `embed` returns a float32 array of shape (len(texts), dimensions), in
+    input order. `model_name` identifies the model and output dimensions
+    in cache keys.
+    """
+
+    model_name: str
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    OpenAI embeddings API.
+
+    Inputs are split into batches that respect the per-request input and
+    token limits, sent with up to `max_concurrency` requests in flight, and
+    reassembled in input order. Token limits are checked against UTF-8 byte
+    counts, which never undercount tokens; only inputs longer than
+    EMBEDDING_MAX_TOKENS bytes are tokenized, to truncate them by tokens.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+        dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+    ):
+        self.client = get_client("openai")
+        self.dimensions = dimensions
+        self.model_name = (
+            f"{EMBEDDING_MODEL}@{dimensions}" if dimensions else EMBEDDING_MODEL
+        )
+        self.max_concurrency = max(1, max_concurrency)
+        self._tokenizer = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        batches = self._make_batches([self._fit(text) for text in texts])
+
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(batches))
+        ) as executor:
+            return np.concatenate(list(executor.map(self._embed_batch, batches)))
+
+    def _fit(self, text: str) -> str:
+        """
+        Truncate an input longer than EMBEDDING_MAX_TOKENS tokens.
+        """
+        if len(text.encode("utf-8")) <= EMBEDDING_MAX_TOKENS:
+            return text
+
+        if self._tokenizer is None:
+            self._tokenizer = EmbeddingTokenizer("openai")
+
+        pieces = self._tokenizer.split(text)
+        if len(pieces) <= EMBEDDING_MAX_TOKENS:
+            return text
+
+        logger.warning(
+            "Truncating %d-token embedding input to %d tokens",
+            len(pieces),
+            EMBEDDING_MAX_TOKENS,
+        )
+        return "".join(pieces[:EMBEDDING_MAX_TOKENS])
+
+    @staticmethod
+    def _make_batches(texts: List[str]) -> List[List[str]]:
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+
+        # Byte-level BPE never yields more tokens than UTF-8 bytes
+        for text in texts:
+            num_tokens = len(text.encode("utf-8"))
+            if batch and (
+                len(batch) >= EMBEDDING_MAX_BATCH_INPUTS
+                or batch_tokens + num_tokens > EMBEDDING_MAX_BATCH_TOKENS
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+
+            batch.append(text)
+            batch_tokens += num_tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one batch, retrying failures with exponential backoff.
+        """
+        params = {"dimensions": self.dimensions} if self.dimensions else {}
+
+        for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+            try:
+                response = self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=texts,
+                    **params,
+                )
+                data = sorted(response.data, key=lambda item: item.index)
+                return np.array([item.embedding for item in data], dtype=np.float32)
+            except Exception as e:
+                if attempt == EMBEDDING_MAX_RETRIES:
+                    raise
+
+                delay = EMBEDDING_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+                logger.warning(
+                    "Embedding batch of %d failed (attempt %d), retrying in %.1fs: %s",
+                    len(texts),
+                    attempt + 1,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+
+
+class ONNXEmbeddingBackend(EmbeddingBackend):
+    """
+    Local CPU embeddings with onnxruntime.
+
+    `model_dir` must contain `model.onnx` and `tokenizer.json` (e.g. a
+    sentence-transformers model exported with Optimum). Batches of
+    `batch_size` texts run concurrently on `num_threads` threads; outputs
+    are mean-pooled over the attention mask (unless the model already
+    returns a `sentence_embedding`), L2-normalized, and truncated to
+    `dimensions` if set.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path = ONNX_MODEL_DIR,
+        batch_size: int = ONNX_BATCH_SIZE,
+        num_threads: int = ONNX_NUM_THREADS,
+        max_length: int = ONNX_MAX_LENGTH,
+        dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_path = model_dir / "model.onnx"
+        tokenizer_path = model_dir / "tokenizer.json"
+
+        for path in (model_path, tokenizer_path):
+            if not path.exists():
+                raise FileNotFoundError(f"ONNX embedding model file not found: {path}")
+
+        self.dimensions = dimensions
+        self.model_name = f"onnx:{model_dir.name}"
+        if dimensions:
+            self.model_name += f"@{dimensions}"
+        self.batch_size = max(1, batch_size)
+        self.num_threads = max(1, num_threads)
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        # Parallelism comes from running batches on separate threads
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.output_names = [o.name for o in self.session.get_outputs()]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        batches = [
+            texts[start:start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.num_threads, len(batches))
+        ) as executor:
+            return np.concatenate(list(executor.map(self._embed_batch, batches)))
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array(
+            [e.attention_mask for e in encodings], dtype=np.int64
+        )
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        outputs = dict(zip(self.output_names, self.session.run(None, inputs)))
+
+        if "sentence_embedding" in outputs:
+            embeddings = outputs["sentence_embedding"]
+        else:
+            # Mean pooling over real (non-padding) tokens
+            hidden = outputs[self.output_names[0]]
+            mask = attention_mask[..., None].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+
+        return truncate(normalize(embeddings), self.dimensions)
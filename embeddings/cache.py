@@ -0,0 +1,283 @@
+# embeddings/cache.py
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import xxhash
+
+from embeddings.quantization import dequantize_int8, quantize_int8
+from config.settings import (
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_DTYPE,
+    QUERY_CACHE_SIZE,
+)
+
+
+def _hit_rate(hits: int, misses: int) -> float:
+    lookups = hits + misses
+    return hits / lookups if lookups else 0.0
+
+
+class SQLiteLRUStore:
+    """
+    Size-bounded key-value table in sqlite, shared by the persistent caches.
+
+    Each row holds the named value `columns` plus its size in bytes and last
+    access time. Reads refresh the access time; writes evict
+    least-recently-used rows once the stored sizes exceed `max_bytes`.
+    """
+
+    # Keys per SQL statement (stays well below sqlite's variable limit)
+    LOOKUP_BATCH = 500
+
+    def __init__(
+        self,
+        path: Path,
+        table: str,
+        columns: Dict[str, str],
+        max_bytes: int,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.columns = list(columns)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        definitions = "".join(
+            f"{name} {definition}, " for name, definition in columns.items()
+        )
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                {definitions}size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+
+        # Tables written by older versions may lack newer columns
+        existing = {
+            row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")
+        }
+        for name, definition in columns.items():
+            if name not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+                )
+
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_last_access "
+            f"ON {table} (last_access)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, tuple]:
+        """
+        The value columns of each stored key, as a dict of key -> tuple.
+        """
+        found: Dict[str, tuple] = {}
+        selected = ", ".join(self.columns)
+
+        with self._lock:
+            for start in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[start:start + self.LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for key, *values in self._conn.execute(
+                    f"SELECT key, {selected} FROM {self.table} "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ):
+                    found[key] = tuple(values)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+
+        return found
+
+    def put_many(self, rows: List[tuple]) -> None:
+        """
+        Store rows of (key, size, *values), then evict down to max_bytes.
+        """
+        now = time.time()
+        names = ", ".join(["key", *self.columns, "size", "last_access"])
+        placeholders = ",".join("?" * (len(self.columns) + 3))
+
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({names}) "
+                f"VALUES ({placeholders})",
+                [(key, *values, size, now) for key, size, *values in rows],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """
+        Drop least-recently-used entries until the table fits in max_bytes.
+        """
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()[0]
+
+        if total <= self.max_bytes:
+            return
+
+        expired = []
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY last_access"
+        ):
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": _hit_rate(self.hits, self.misses),
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by normalized text hash and model.
+
+    Vectors are stored as packed blobs in sqlite, either float32 or int8
+    codes followed by a float32 scale (`dtype="int8"`, about 4x smaller).
+    Least-recently-used entries are evicted once the stored vectors exceed
+    `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: Path = EMBEDDING_CACHE_PATH,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        dtype: str = EMBEDDING_CACHE_DTYPE,
+    ):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.dtype = dtype
+        self._store = SQLiteLRUStore(
+            path,
+            "embedding_cache",
+            {"vector": "BLOB NOT NULL", "dtype": "TEXT NOT NULL DEFAULT 'float32'"},
+            max_bytes,
+        )
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        normalized = " ".join(text.split())
+        return xxhash.xxh3_128_hexdigest(f"{model}\0{normalized}".encode("utf-8"))
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        found = self._store.get_many(keys)
+        return [
+            self._decode(*found[key]) if key in found else None
+            for key in keys
+        ]
+
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if self.dtype == "int8":
+            codes, scales = quantize_int8(vectors)
+            blobs = [
+                code.tobytes() + scale.tobytes()
+                for code, scale in zip(codes, scales)
+            ]
+        else:
+            blobs = [vector.tobytes() for vector in vectors]
+
+        self._store.put_many(
+            [(key, len(blob), blob, self.dtype) for key, blob in zip(keys, blobs)]
+        )
+
+    @staticmethod
+    def _decode(blob: bytes, dtype: str) -> np.ndarray:
+        if dtype == "int8":
+            codes = np.frombuffer(blob[:-4], dtype=np.int8)
+            scale = np.frombuffer(blob[-4:], dtype=np.float32)
+            return dequantize_int8(codes[None, :], scale)[0]
+
+        return np.frombuffer(blob, dtype=np.float32)
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU of query embeddings, consulted before the persistent
+    cache so repeated questions cost neither a disk read nor an API call.
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": _hit_rate(self.hits, self.misses),
+            "entries": entries,
+        }
@@ -1,30 +1,109 @@
 # embeddings/embedder.py
 
-from typing import List
+from typing import Dict, List
 
-from openai import OpenAI
+import numpy as np
 
-from config.settings import OPENAI_API_KEY, EMBEDDING_MODEL
+from embeddings.backends import (
+    EmbeddingBackend,
+    ONNXEmbeddingBackend,
+    OpenAIEmbeddingBackend,
+)
+from embeddings.cache import EmbeddingCache, QueryEmbeddingCache
+from config.settings import EMBEDDING_BACKEND, EMBEDDING_CACHE_ENABLED
 
 
 class Embedder:
     """
     Responsible for converting text into vector embeddings.
+
+    The actual model runs in a pluggable backend ("openai" or "onnx").
+    Embeddings are returned as contiguous float32 arrays and cached on disk
+    by normalized text and model; query embeddings are additionally kept
+    in an in-process LRU.
     """
 
-    def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+    # Shared by all instances in the process
+    _backend = None
+    _cache = None
+    _query_cache = None
+
+    def __init__(self, backend: EmbeddingBackend = None):
+        if backend is None:
+            if Embedder._backend is None:
+                Embedder._backend = self._create_backend(EMBEDDING_BACKEND)
+            backend = Embedder._backend
+
+        if Embedder._query_cache is None:
+            Embedder._query_cache = QueryEmbeddingCache()
+            if EMBEDDING_CACHE_ENABLED:
+                Embedder._cache = EmbeddingCache()
+
+        self.backend = backend
+        self.cache = Embedder._cache
+        self.query_cache = Embedder._query_cache
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    @staticmethod
+    def _create_backend(name: str) -> EmbeddingBackend:
+        if name == "openai":
+            return OpenAIEmbeddingBackend()
+        if name == "onnx":
+            return ONNXEmbeddingBackend()
+        raise ValueError(f"Unsupported embedding backend: {name}")
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
+        Returns a float32 array of shape (len(texts), dimensions).
         """
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
+
+        if self.cache is None:
+            return self.backend.embed(texts)
+
+        keys = [
+            EmbeddingCache.make_key(t, self.backend.model_name) for t in texts
+        ]
+        embeddings = self.cache.get_many(keys)
+
+        # Embed each distinct missing text once
+        missing: Dict[str, str] = {}
+        for key, text, embedding in zip(keys, texts, embeddings):
+            if embedding is None:
+                missing.setdefault(key, text)
 
-        response = self.client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=texts,
+        computed = None
+        if missing:
+            computed = self.backend.embed(list(missing.values()))
+            self.cache.put_many(list(missing), computed)
+            rows = {key: i for i, key in enumerate(missing)}
+
+        dimensions = (
+            computed.shape[1] if computed is not None
+            else len(embeddings[0])
         )
+        result = np.empty((len(texts), dimensions), dtype=np.float32)
+        for i, (key, embedding) in enumerate(zip(keys, embeddings)):
+            result[i] = computed[rows[key]] if embedding is None else embedding
+
+        return result
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a single query, checking the in-process LRU first.
+        """
+        key = EmbeddingCache.make_key(query, self.backend.model_name)
+
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            embedding = self.embed_texts([query])[0]
+            self.query_cache.put(key, embedding)
+
+        return embedding
 
-        return [item.embedding for item in response.data]
+    def cache_stats(self) -> dict:
+        return {
+            "persistent": self.cache.stats() if self.cache is not None else None,
+            "query": self.query_cache.stats(),
+        }
@@ -0,0 +1,214 @@
+# embeddings/lexical_index.py
+
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import LEXICAL_INDEX_PATH, BM25_K1, BM25_B
+
+
+# Words, numbers and dotted/hyphenated identifiers ("3.2.1", "covid-19")
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    In-process BM25 inverted index over the stored chunks.
+
+    Keeps postings (term -> {chunk id: term frequency}) plus each chunk's
+    text, metadata and length, so keyword queries are answered without an
+    embedding call or a Chroma round trip. The index mirrors the Chroma
+    collection and is persisted next to it in sqlite, one row per chunk:
+    changes are written as they are made and committed by `save`, and the
+    postings are rebuilt from the rows when the index is opened.
+    """
+
+    # Bumped whenever the stored layout or tokenization changes
+    VERSION = 2
+
+    def __init__(self, path: Path = LEXICAL_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, Tuple[str, Dict, int]] = {}
+        self._total_length = 0
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.VERSION:
+            # Incompatible or new file: start empty, to be rebuilt from Chroma
+            self._conn.execute("DROP TABLE IF EXISTS chunks")
+            self._conn.execute(f"PRAGMA user_version = {self.VERSION}")
+
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        for chunk_id, text, metadata in self._conn.execute(
+            "SELECT chunk_id, text, metadata FROM chunks"
+        ):
+            self._insert(chunk_id, text, json.loads(metadata))
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def save(self) -> None:
+        """
+        Commit the changes made since the index was opened or last saved.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            self._conn.commit()
+            self._dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = {}
+            self._docs = {}
+            self._total_length = 0
+            self._conn.execute("DELETE FROM chunks")
+            self._dirty = True
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        """
+        Insert or replace chunks.
+        """
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                self._remove(chunk_id)
+                self._insert(chunk_id, text, metadata)
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, text, metadata) "
+                "VALUES (?, ?, ?)",
+                [
+                    (chunk_id, text, json.dumps(metadata))
+                    for chunk_id, text, metadata in zip(ids, texts, metadatas)
+                ],
+            )
+            self._dirty = True
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict]) -> None:
+        with self._lock:
+            rows = []
+            for chunk_id, metadata in zip(ids, metadatas):
+                if chunk_id in self._docs:
+                    text, _, length = self._docs[chunk_id]
+                    self._docs[chunk_id] = (text, metadata, length)
+                    rows.append((json.dumps(metadata), chunk_id))
+
+            self._conn.executemany(
+                "UPDATE chunks SET metadata = ? WHERE chunk_id = ?", rows
+            )
+            self._dirty = True
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for chunk_id in ids:
+                self._remove(chunk_id)
+
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?",
+                [(chunk_id,) for chunk_id in ids],
+            )
+            self._dirty = True
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        predicate: Optional[Callable[[str, Dict], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k (chunk id, BM25 score) pairs, best first. Chunks without any
+        query term are never returned, nor are chunks for which
+        `predicate(chunk id, metadata)` is false.
+        """
+        with self._lock:
+            num_docs = len(self._docs)
+            if not num_docs:
+                return []
+
+            avg_length = self._total_length / num_docs
+            scores: Dict[str, float] = {}
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                df = len(postings)
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+                for chunk_id, tf in postings.items():
+                    length = self._docs[chunk_id][2]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + (
+                        idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    )
+
+            items = scores.items()
+            if predicate is not None:
+                items = [
+                    (chunk_id, score)
+                    for chunk_id, score in items
+                    if predicate(chunk_id, self._docs[chunk_id][1])
+                ]
+
+            return heapq.nlargest(k, items, key=lambda item: item[1])
+
+    def metadatas(self) -> List[Dict]:
+        with self._lock:
+            return [metadata for _, metadata, _ in self._docs.values()]
+
+    def get(self, chunk_id: str) -> Dict:
+        text, metadata, _ = self._docs[chunk_id]
+        return {"text": text, "metadata": metadata}
+
+    def _insert(self, chunk_id: str, text: str, metadata: Dict) -> None:
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[chunk_id] = tf
+
+        self._docs[chunk_id] = (text, metadata, length)
+        self._total_length += length
+
+    def _remove(self, chunk_id: str) -> None:
+        doc = self._docs.pop(chunk_id, None)
+        if doc is None:
+            return
+
+        text, _, length = doc
+        self._total_length -= length
+
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
@@ -0,0 +1,47 @@
+# embeddings/quantization.py
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize the rows of a 2-D float array.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+def truncate(vectors: np.ndarray, dimensions: Optional[int]) -> np.ndarray:
+    """
+    Keep the first `dimensions` components of each row and renormalize.
+
+    This is how text-embedding-3 models shorten embeddings natively; for
+    local models it is only meaningful if they were trained for it
+    (Matryoshka representation learning).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not dimensions or dimensions >= vectors.shape[1]:
+        return vectors
+    return normalize(vectors[:, :dimensions])
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-vector scalar quantization.
+
+    Returns (codes, scales): int8 codes of the same shape as `vectors` and
+    one float32 scale per row, such that vectors ~= codes * scales[:, None].
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+
+    codes = np.rint(vectors / scales[:, None])
+    return np.clip(codes, -127, 127).astype(np.int8), scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
@@ -0,0 +1,105 @@
+# embeddings/scope.py
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Sequence, Union
+
+import xxhash
+
+from config.settings import CHROMA_COLLECTION_NAME, TENANT_COLLECTIONS
+
+
+@dataclass(frozen=True)
+class RetrievalScope:
+    """
+    Restricts retrieval to part of the corpus.
+
+      - tenant: chunks ingested for this tenant
+      - documents: uploaded file names (chunk metadata "document")
+      - sources: processed text paths (chunk metadata "source")
+
+    Unset fields do not restrict. Callers may pass a plain dict with the
+    same keys wherever a scope is accepted.
+
+    `chunk_ids` are stored chunks that are in scope whatever their document
+    or source (only the tenant applies): the kept copies of chunks that
+    documents in scope skipped as duplicates. RetrieverAgent fills it in.
+    """
+
+    tenant: Optional[str] = None
+    documents: Optional[Sequence[str]] = None
+    sources: Optional[Sequence[str]] = None
+    chunk_ids: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_value(
+        cls, scope: Union["RetrievalScope", Dict, None]
+    ) -> "RetrievalScope":
+        if scope is None:
+            return cls()
+        if isinstance(scope, cls):
+            return scope
+
+        return cls(
+            tenant=scope.get("tenant"),
+            documents=scope.get("documents"),
+            sources=scope.get("sources"),
+        )
+
+    def _conditions(self) -> Dict[str, Sequence[str]]:
+        conditions = {}
+        if self.tenant is not None:
+            conditions["tenant"] = [self.tenant]
+        if self.documents:
+            conditions["document"] = list(self.documents)
+        if self.sources:
+            conditions["source"] = list(self.sources)
+        return conditions
+
+    def where(self) -> Optional[Dict]:
+        """
+        Equivalent Chroma `where` filter, or None for an unrestricted scope.
+        """
+        clauses = [
+            {key: values[0]} if len(values) == 1 else {key: {"$in": values}}
+            for key, values in self._conditions().items()
+        ]
+
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {"$and": clauses}
+
+    def matches(self, metadata: Dict, chunk_id: Optional[str] = None) -> bool:
+        conditions = self._conditions()
+        if self.chunk_ids and chunk_id in self.chunk_ids:
+            # Only the tenant restricts referenced chunks
+            conditions.pop("document", None)
+            conditions.pop("source", None)
+
+        return all(
+            metadata.get(key) in values
+            for key, values in conditions.items()
+        )
+
+
+def collection_name(tenant: Optional[str]) -> str:
+    """
+    Chroma collection holding a tenant's chunks: a separate collection per
+    tenant with TENANT_COLLECTIONS, otherwise the shared one.
+
+    Per-tenant names are "<collection>-<slug>-<hash>": the slug keeps them
+    readable, and the hash of the exact tenant keeps tenants with the same
+    slug apart. They always end in an alphanumeric character, as Chroma
+    requires.
+    """
+    if tenant is None or not TENANT_COLLECTIONS:
+        return CHROMA_COLLECTION_NAME
+
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", tenant).strip("-")[:48]
+    tenant_hash = xxhash.xxh64_hexdigest(tenant.encode("utf-8"))
+
+    if not slug:
+        return f"{CHROMA_COLLECTION_NAME}-{tenant_hash}"
+    return f"{CHROMA_COLLECTION_NAME}-{slug}-{tenant_hash}"
@@ -0,0 +1,82 @@
+# embeddings/tokenizer.py
+
+from pathlib import Path
+from typing import Dict, List
+
+from tokenizers import Tokenizer
+
+from config.settings import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_TOKENIZER,
+    EMBEDDING_MAX_TOKENS,
+    ONNX_MODEL_DIR,
+    ONNX_MAX_LENGTH,
+)
+
+
+class EmbeddingTokenizer:
+    """
+    Tokenizer of an embedding backend, loaded once per process.
+
+      - openai: EMBEDDING_TOKENIZER (cl100k_base), a local tokenizer.json
+        path or a Hugging Face Hub repository id
+      - onnx: the model's own tokenizer.json in ONNX_MODEL_DIR, so nothing
+        is downloaded
+
+    `max_tokens` is the longest input the backend embeds without
+    truncation, excluding special tokens.
+    """
+
+    _tokenizers: Dict[str, Tokenizer] = {}
+
+    def __init__(self, backend: str = EMBEDDING_BACKEND):
+        if backend not in EmbeddingTokenizer._tokenizers:
+            EmbeddingTokenizer._tokenizers[backend] = self._load(backend)
+
+        self._tokenizer = EmbeddingTokenizer._tokenizers[backend]
+
+        if backend == "onnx":
+            # Room for the special tokens (e.g. [CLS] and [SEP]) added on embedding
+            num_special = len(self._tokenizer.encode("").ids)
+            self.max_tokens = ONNX_MAX_LENGTH - num_special
+        else:
+            self.max_tokens = EMBEDDING_MAX_TOKENS
+
+    @staticmethod
+    def _load(backend: str) -> Tokenizer:
+        if backend == "onnx":
+            tokenizer_path = Path(ONNX_MODEL_DIR) / "tokenizer.json"
+            if not tokenizer_path.exists():
+                raise FileNotFoundError(
+                    f"ONNX tokenizer file not found: {tokenizer_path}"
+                )
+            tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        elif backend == "openai":
+            if Path(EMBEDDING_TOKENIZER).exists():
+                tokenizer = Tokenizer.from_file(str(EMBEDDING_TOKENIZER))
+            else:
+                tokenizer = Tokenizer.from_pretrained(str(EMBEDDING_TOKENIZER))
+        else:
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+
+        # Count every token; exported tokenizer.json files often pad/truncate
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        return tokenizer
+
+    def encode(self, text: str) -> List[int]:
+        return self._tokenizer.encode(text, add_special_tokens=False).ids
+
+    def split(self, text: str) -> List[str]:
+        """
+        The text cut into one piece per token, so that "".join(pieces) ==
+        text. Text between tokens (e.g. whitespace dropped by WordPiece)
+        stays with the preceding piece. Unlike decoding token IDs, this is
+        lossless for every tokenizer type.
+        """
+        offsets = self._tokenizer.encode(text, add_special_tokens=False).offsets
+        if not offsets:
+            return []
+
+        bounds = [0] + [start for start, _ in offsets[1:]] + [len(text)]
+        return [text[bounds[i]:bounds[i + 1]] for i in range(len(offsets))]
@@ -1,68 +1,540 @@
 # embeddings/vector_store.py
 
-from typing import List, Dict
+import heapq
+import itertools
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
 import chromadb
+import xxhash
 
 from embeddings.embedder import Embedder
+from embeddings.lexical_index import LexicalIndex
+from embeddings.scope import RetrievalScope, collection_name
 from config.settings import (
     CHROMA_DIR,
     CHROMA_COLLECTION_NAME,
+    CHROMA_UPSERT_BATCH_SIZE,
+    CHROMA_UPSERT_PIPELINE_DEPTH,
+    LEXICAL_INDEX_PATH,
+    RETRIEVAL_MODE,
+    RETRIEVAL_CANDIDATES,
+    RRF_K,
     TOP_K_RETRIEVAL,
 )
 
 
-class VectorStore:
-    _client = None
-    _collection = None
+logger = logging.getLogger(__name__)
 
-    def __init__(self):
-        if VectorStore._client is None:
-            CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+# Called as progress(chunks_written, total); total is None while streaming
+ProgressCallback = Callable[[int, Optional[int]], None]
 
-            VectorStore._client = chromadb.PersistentClient(
-                path=str(CHROMA_DIR)
-            )
 
-            VectorStore._collection = (
-                VectorStore._client.get_or_create_collection(
-                    name=CHROMA_COLLECTION_NAME
+def chunk_base_id(source: str, text: str, tenant: Optional[str] = None) -> str:
+    """
+    Content-addressed chunk ID, without the occurrence suffix.
+    """
+    text_hash = xxhash.xxh3_64_hexdigest(text.encode("utf-8"))
+    if tenant is not None:
+        return f"{tenant}/{source}::{text_hash}"
+    return f"{source}::{text_hash}"
+
+
+class UpsertPipeline:
+    """
+    Embeds upsert batches on a shared executor while earlier batches are
+    written. At most CHROMA_UPSERT_PIPELINE_DEPTH batches are in flight, so
+    memory stays bounded, and batches are written in submission order on the
+    calling thread, each committed on its own.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        store: "VectorStore",
+        progress: Optional[ProgressCallback] = None,
+        streaming: bool = False,
+    ):
+        with UpsertPipeline._executor_lock:
+            if UpsertPipeline._executor is None:
+                UpsertPipeline._executor = ThreadPoolExecutor(
+                    max_workers=CHROMA_UPSERT_PIPELINE_DEPTH,
+                    thread_name_prefix="upsert-embed",
                 )
+
+        self._store = store
+        self._progress = progress
+        self._streaming = streaming
+        self._pending = deque()  # (ids, texts, metadatas, embeddings future)
+        self._submitted = 0
+        self._written = 0
+
+    def submit(self, ids: List[str], chunks: List[Dict]) -> None:
+        batch_size = self._store._upsert_batch_size
+        self._submitted += len(chunks)
+
+        for start in range(0, len(chunks), batch_size):
+            texts = [c["text"] for c in chunks[start:start + batch_size]]
+            metadatas = [c["metadata"] for c in chunks[start:start + batch_size]]
+            future = self._executor.submit(self._store._embedder.embed_texts, texts)
+            self._pending.append(
+                (ids[start:start + batch_size], texts, metadatas, future)
             )
 
-        self._client = VectorStore._client
-        self._collection = VectorStore._collection
-        self._embedder = Embedder()
+            while len(self._pending) > CHROMA_UPSERT_PIPELINE_DEPTH:
+                self._write_next()
 
-    def add_documents(self, chunks: List[Dict]) -> None:
-        texts = [c["text"] for c in chunks]
-        metadatas = [c["metadata"] for c in chunks]
-        ids = [
-            f"{c['metadata']['source']}::{c['metadata']['chunk_index']}"
-            for c in chunks
-        ]
+    def flush(self) -> None:
+        while self._pending:
+            self._write_next()
+
+    def cancel(self) -> None:
+        for *_, future in self._pending:
+            future.cancel()
+        self._pending.clear()
 
-        embeddings = self._embedder.embed_texts(texts)
+    def _write_next(self) -> None:
+        ids, texts, metadatas, future = self._pending.popleft()
 
-        self._collection.add(
+        self._store._collection.upsert(
             documents=texts,
-            embeddings=embeddings,
+            embeddings=future.result(),
             metadatas=metadatas,
             ids=ids,
         )
+        self._store._lexical_index.add(ids, texts, metadatas)
+        self._written += len(ids)
+
+        logger.debug("Upserted %d of %d chunks", self._written, self._submitted)
+        if self._progress is not None:
+            # The overall total is only known when not streaming
+            self._progress(
+                self._written, None if self._streaming else self._submitted
+            )
+
+
+class VectorStore:
+    """
+    Chroma collection of embedded chunks, mirrored by a BM25 lexical index.
+
+    A store is bound to one tenant (None for untenanted data). Chunks it
+    writes carry the tenant in their metadata and IDs; with
+    TENANT_COLLECTIONS each tenant also gets its own collection.
+    """
+
+    _client = None
+    _upsert_batch_size = None
+
+    # collection name -> (collection, lexical index), shared by all instances
+    _partitions: Dict[str, tuple] = {}
+    _partitions_lock = threading.Lock()
+
+    def __init__(self, tenant: Optional[str] = None):
+        with VectorStore._partitions_lock:
+            if VectorStore._client is None:
+                CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+
+                VectorStore._client = chromadb.PersistentClient(
+                    path=str(CHROMA_DIR)
+                )
+                VectorStore._partitions = {}
+
+                VectorStore._upsert_batch_size = min(
+                    CHROMA_UPSERT_BATCH_SIZE,
+                    VectorStore._client.get_max_batch_size(),
+                )
+
+            name = collection_name(tenant)
+            if name not in VectorStore._partitions:
+                collection = VectorStore._client.get_or_create_collection(
+                    name=name
+                )
+                VectorStore._partitions[name] = (
+                    collection,
+                    self._load_lexical_index(collection),
+                )
+
+        self.tenant = tenant
+        self._client = VectorStore._client
+        self._collection, self._lexical_index = VectorStore._partitions[name]
+        self._embedder = Embedder()
+
+    @staticmethod
+    def _load_lexical_index(collection) -> LexicalIndex:
+        """
+        Open the persisted lexical index, rebuilding it from the collection
+        when it is missing or out of date.
+        """
+        path = LEXICAL_INDEX_PATH
+        if collection.name != CHROMA_COLLECTION_NAME:
+            path = path.with_name(f"{path.stem}-{collection.name}{path.suffix}")
+
+        index = LexicalIndex(path)
+        num_chunks = collection.count()
+
+        if len(index) == num_chunks:
+            return index
+
+        logger.info(
+            "Rebuilding lexical index of %s from %d stored chunks",
+            collection.name,
+            num_chunks,
+        )
+        index.clear()
+        page_size = 1000
+
+        for offset in range(0, num_chunks, page_size):
+            page = collection.get(
+                include=["documents", "metadatas"],
+                limit=page_size,
+                offset=offset,
+            )
+            index.add(page["ids"], page["documents"], page["metadatas"])
+
+        index.save()
+        return index
+
+    def add_documents(
+        self,
+        chunks: List[Dict],
+        progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        chunks = list(self._with_tenant(chunks))
+
+        try:
+            self._upsert(self._chunk_ids(chunks), chunks, progress)
+        finally:
+            self._lexical_index.save()
+
+    def sync_documents(
+        self,
+        chunks: Iterable[Dict],
+        source: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        allow_empty: bool = False,
+    ) -> Dict:
+        """
+        Bring the stored chunks of one source in line with `chunks`.
+
+        Chunk IDs are derived from the chunk text, so only new or changed
+        chunks are embedded; unchanged chunks only get their metadata
+        refreshed, and chunks no longer present are deleted.
+
+        `chunks` may be a generator. With `batch_size` set, every batch is
+        embedded and written as soon as it is complete, so early chunks are
+        searchable while later ones are still being produced.
+
+        New chunks are committed in upsert batches, so a sync that fails
+        part-way resumes where it stopped: committed chunks already exist
+        on the next run and are not embedded again.
+
+        An empty `chunks` leaves the stored source untouched, unless
+        `allow_empty` is set (e.g. when every chunk of the new version was
+        dropped as a duplicate); then all of its chunks are deleted.
+        """
+        stats = {"added": 0, "updated": 0, "deleted": 0, "total": 0}
+
+        chunks = self._with_tenant(chunks)
+        if source is None:
+            first = next(chunks, None)
+            if first is None:
+                return stats
+            source = first["metadata"]["source"]
+            chunks = itertools.chain([first], chunks)
+
+        existing = self._collection.get(
+            where=RetrievalScope(tenant=self.tenant, sources=[source]).where(),
+            include=["metadatas"],
+        )
+        # Untenanted stores must not touch tenant chunks of the same source
+        existing_metadata = {
+            chunk_id: metadata
+            for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+            if metadata.get("tenant") == self.tenant
+        }
+
+        pipeline = UpsertPipeline(self, progress, streaming=bool(batch_size))
+        try:
+            return self._sync(
+                chunks,
+                source,
+                existing_metadata,
+                batch_size,
+                pipeline,
+                stats,
+                allow_empty,
+            )
+        finally:
+            pipeline.cancel()
+            self._lexical_index.save()
+
+    def _sync(
+        self,
+        chunks: Iterator[Dict],
+        source: str,
+        existing_metadata: Dict[str, Dict],
+        batch_size: Optional[int],
+        pipeline: UpsertPipeline,
+        stats: Dict,
+        allow_empty: bool = False,
+    ) -> Dict:
+        seen_ids = set()
+        occurrences = Counter()
+
+        for batch in self._batched(chunks, batch_size):
+            ids = self._chunk_ids(batch, occurrences)
+            seen_ids.update(ids)
+            stats["total"] += len(batch)
+
+            new_ids, new_chunks = [], []
+            changed_ids, changed_metadatas = [], []
+            for chunk_id, chunk in zip(ids, batch):
+                if chunk_id not in existing_metadata:
+                    new_ids.append(chunk_id)
+                    new_chunks.append(chunk)
+                elif existing_metadata[chunk_id] != chunk["metadata"]:
+                    changed_ids.append(chunk_id)
+                    changed_metadatas.append(chunk["metadata"])
+
+            if new_ids:
+                pipeline.submit(new_ids, new_chunks)
+                stats["added"] += len(new_ids)
+
+            if changed_ids:
+                self._collection.update(ids=changed_ids, metadatas=changed_metadatas)
+                self._lexical_index.update_metadata(changed_ids, changed_metadatas)
+                stats["updated"] += len(changed_ids)
+
+        pipeline.flush()
+
+        # Never wipe a source because nothing was produced this time
+        if stats["total"] == 0 and not allow_empty:
+            return stats
+
+        # Delete last, so a failed sync never loses live chunks
+        orphaned_ids = list(set(existing_metadata) - seen_ids)
+        if orphaned_ids:
+            self._collection.delete(ids=orphaned_ids)
+            self._lexical_index.delete(orphaned_ids)
+            stats["deleted"] = len(orphaned_ids)
+
+        logger.info(
+            "Synced %s: %d added, %d updated, %d deleted",
+            source,
+            stats["added"],
+            stats["updated"],
+            stats["deleted"],
+        )
+        return stats
+
+    def _with_tenant(self, chunks: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Stamp this store's tenant on the chunk metadata.
+        """
+        if self.tenant is None:
+            yield from chunks
+            return
+
+        for chunk in chunks:
+            yield {
+                **chunk,
+                "metadata": {**chunk["metadata"], "tenant": self.tenant},
+            }
+
+    @staticmethod
+    def _batched(
+        chunks: Iterator[Dict],
+        batch_size: Optional[int],
+    ) -> Iterator[List[Dict]]:
+        if not batch_size:
+            batch = list(chunks)
+            if batch:
+                yield batch
+            return
+
+        while batch := list(itertools.islice(chunks, batch_size)):
+            yield batch
+
+    def _upsert(
+        self,
+        ids: List[str],
+        chunks: List[Dict],
+        progress: Optional[ProgressCallback] = None,
+    ) -> None:
+        """
+        Embed and write chunks in upsert batches through an UpsertPipeline.
+        """
+        pipeline = UpsertPipeline(self, progress)
+        try:
+            pipeline.submit(ids, chunks)
+            pipeline.flush()
+        finally:
+            pipeline.cancel()
+
+    @staticmethod
+    def _chunk_ids(
+        chunks: List[Dict],
+        seen: Optional[Counter] = None,
+    ) -> List[str]:
+        """
+        Content-addressed IDs: `source::<text hash>`, with an occurrence
+        suffix when the same text appears more than once in a source.
+        Pass the same `seen` counter across batches of one source.
+        """
+        if seen is None:
+            seen = Counter()
+        ids = []
+
+        for c in chunks:
+            base = chunk_base_id(
+                c["metadata"]["source"],
+                c["text"],
+                c["metadata"].get("tenant"),
+            )
+            occurrence = seen[base]
+            seen[base] += 1
+            ids.append(base if occurrence == 0 else f"{base}#{occurrence}")
+
+        return ids
 
 
-    def retrieve(self, query: str, k: int = TOP_K_RETRIEVAL) -> List[Dict]:
-        query_embedding = self._embedder.embed_texts([query])[0]
+    def retrieve(
+        self,
+        query: str,
+        k: int = TOP_K_RETRIEVAL,
+        mode: str = RETRIEVAL_MODE,
+        scope: Optional[RetrievalScope] = None,
+    ) -> List[Dict]:
+        """
+        mode:
+          - vector: nearest chunks by embedding
+          - lexical: BM25 only, no embedding call (falls back to vector
+            when no query term occurs in the index)
+          - hybrid: reciprocal rank fusion of vector and BM25 rankings
+
+        `scope` (a RetrievalScope or dict) limits the search to matching
+        chunks through a Chroma `where` filter, plus the chunks listed in
+        its `chunk_ids`.
+        """
+        scope = RetrievalScope.from_value(scope)
+
+        if mode == "vector":
+            return self._vector_search(query, k, scope)
+
+        if mode == "lexical":
+            hits = self._lexical_search(query, k, scope)
+            if not hits:
+                return self._vector_search(query, k, scope)
+            return [self._lexical_index.get(chunk_id) for chunk_id, _ in hits]
+
+        if mode == "hybrid":
+            return self._hybrid_search(query, k, scope)
+
+        raise ValueError(f"Unsupported retrieval mode: {mode}")
+
+    def documents(
+        self, scope: Optional[RetrievalScope] = None
+    ) -> Set[Tuple[Optional[str], Optional[str]]]:
+        """
+        (tenant, document) pairs of the stored chunks in scope. The document
+        is None for chunks ingested without that metadata.
+        """
+        scope = RetrievalScope.from_value(scope)
+        return {
+            (metadata.get("tenant"), metadata.get("document"))
+            for metadata in self._lexical_index.metadatas()
+            if scope.matches(metadata)
+        }
+
+    def _lexical_search(self, query: str, k: int, scope: RetrievalScope):
+        predicate = None
+        if scope.where() is not None:
+            def predicate(chunk_id: str, metadata: Dict) -> bool:
+                return scope.matches(metadata, chunk_id)
+
+        return self._lexical_index.search(query, k, predicate)
+
+    def _vector_search(
+        self, query: str, k: int, scope: RetrievalScope
+    ) -> List[Dict]:
+        return [
+            {"text": doc, "metadata": meta}
+            for _, doc, meta in self._vector_query(query, k, scope)
+        ]
+
+    def _vector_query(self, query: str, k: int, scope: RetrievalScope):
+        """
+        (id, document, metadata) triples of the k nearest chunks in scope.
+        """
+        query_embedding = self._embedder.embed_query(query)
 
         results = self._collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embedding[None, :],
             n_results=k,
+            where=scope.where(),
         )
+        hits = self._query_hits(results)
 
-        documents = results.get("documents", [[]])[0]
-        metadatas = results.get("metadatas", [[]])[0]
+        if scope.chunk_ids:
+            # Referenced chunks are stored under other documents
+            results = self._collection.query(
+                query_embeddings=query_embedding[None, :],
+                ids=sorted(scope.chunk_ids),
+                n_results=min(k, len(scope.chunk_ids)),
+                where=RetrievalScope(tenant=scope.tenant).where(),
+            )
+            hits = heapq.nsmallest(
+                k,
+                {**hits, **self._query_hits(results)}.items(),
+                key=lambda item: item[1][0],
+            )
+            hits = dict(hits)
 
         return [
-            {"text": doc, "metadata": meta}
-            for doc, meta in zip(documents, metadatas)
+            (chunk_id, document, metadata)
+            for chunk_id, (_, document, metadata) in hits.items()
         ]
+
+    @staticmethod
+    def _query_hits(results) -> Dict[str, tuple]:
+        """
+        Chunk id -> (distance, document, metadata) of one query's results.
+        """
+        return {
+            chunk_id: (distance, document, metadata)
+            for chunk_id, distance, document, metadata in zip(
+                results.get("ids", [[]])[0],
+                results.get("distances", [[]])[0],
+                results.get("documents", [[]])[0],
+                results.get("metadatas", [[]])[0],
+            )
+        }
+
+    def _hybrid_search(
+        self, query: str, k: int, scope: RetrievalScope
+    ) -> List[Dict]:
+        candidates = max(k, RETRIEVAL_CANDIDATES)
+
+        vector_hits = self._vector_query(query, candidates, scope)
+        lexical_hits = self._lexical_search(query, candidates, scope)
+
+        scores: Dict[str, float] = {}
+        chunks: Dict[str, Dict] = {}
+
+        for rank, (chunk_id, doc, meta) in enumerate(vector_hits):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank + 1)
+            chunks[chunk_id] = {"text": doc, "metadata": meta}
+
+        for rank, (chunk_id, _) in enumerate(lexical_hits):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank + 1)
+            if chunk_id not in chunks:
+                chunks[chunk_id] = self._lexical_index.get(chunk_id)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [chunks[chunk_id] for chunk_id in ranked]
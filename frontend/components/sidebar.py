@@ -8,20 +8,45 @@ def render_sidebar(ingestion_service):
         st.header("📂 Document Ingestion")
 
         uploaded_file = st.file_uploader(
-            "Upload a PDF or image document",
-            type=["pdf", "png", "jpg", "jpeg"],
+            "Upload a PDF, image or text document",
+            type=[
+                "pdf", "png", "jpg", "jpeg",
+                "txt", "md", "html", "htm", "docx",
+            ],
         )
 
         if uploaded_file and st.button("Ingest Document"):
             with st.spinner("Processing document..."):
+                progress_bar = st.progress(0.0)
+
+                def report_progress(written, total):
+                    if total:
+                        progress_bar.progress(
+                            written / total,
+                            text=f"Embedded {written}/{total} chunks",
+                        )
+                    else:
+                        progress_bar.progress(
+                            0.0, text=f"Embedded {written} chunks"
+                        )
+
                 try:
-                    result = ingestion_service.ingest(uploaded_file)
+                    result = ingestion_service.ingest(
+                        uploaded_file, progress=report_progress
+                    )
+                    progress_bar.empty()
                     st.session_state.documents_ingested = True
 
-                    st.success(
-                        f"Document ingested successfully. "
-                        f"Chunks created: {result['num_chunks']}"
-                    )
+                    if result["status"] == "skipped":
+                        st.info(
+                            f"Document unchanged since last ingestion. "
+                            f"Chunks stored: {result['num_chunks']}"
+                        )
+                    else:
+                        st.success(
+                            f"Document ingested successfully. "
+                            f"Chunks created: {result['num_chunks']}"
+                        )
                 except Exception as e:
                     st.error(f"Ingestion failed: {e}")
 
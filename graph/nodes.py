@@ -21,7 +21,10 @@ def retriever_node(state: GraphState) -> GraphState:
     Retrieve relevant document chunks for the user's question.
     """
 
-    documents = retriever_agent.retrieve(state["question"])
+    documents = retriever_agent.retrieve(
+        state["question"],
+        scope=state.get("scope"),
+    )
     return {
         **state,
         "documents": documents,
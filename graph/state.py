@@ -11,6 +11,7 @@ class GraphState(TypedDict, total=False):
     
     # User Input
     question: str
+    scope: Optional[Dict]
 
     
     # Retrieval Output
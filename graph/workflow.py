@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from langgraph.graph import StateGraph, END
 
 from graph.state import GraphState
@@ -47,12 +49,13 @@ def build_workflow():
     return graph.compile()
 
 
-def run_workflow(question: str) -> str:
+def run_workflow(question: str, scope: Optional[Dict] = None) -> str:
     app = build_workflow()
 
     final_state = app.invoke(
         {
             "question": question,
+            "scope": scope,
             "retry_count": 0,
         }
     )
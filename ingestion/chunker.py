@@ -1,11 +1,14 @@
 # ingestion/chunker.py
 
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from config.settings import (
     CHUNK_SIZE,
     CHUNK_OVERLAP,
+    CHUNK_MODE,
+    CHUNK_SIZE_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
     PROCESSED_DATA_DIR,
 )
 
@@ -14,12 +17,42 @@ class TextChunker:
     """
     Splits cleaned text into semantically meaningful chunks
     suitable for embedding.
+
+    Modes:
+      - chars: paragraph-aware window measured in characters
+      - tokens: paragraph-aware window measured in tokens of the active
+        embedding backend, with CHUNK_OVERLAP_TOKENS tokens shared between
+        adjacent chunks; windows never exceed what the backend embeds
+        without truncation
     """
 
-    def chunk(self, cleaned_text_path: Path) -> List[Dict]:
+    def __init__(self, mode: str = CHUNK_MODE):
+        if mode not in ("chars", "tokens"):
+            raise ValueError(f"Unsupported chunking mode: {mode}")
+
+        self.mode = mode
+        self._tokenizer = None
+
+        if mode == "tokens":
+            from embeddings.tokenizer import EmbeddingTokenizer
+
+            self._tokenizer = EmbeddingTokenizer()
+            self._size_tokens = min(CHUNK_SIZE_TOKENS, self._tokenizer.max_tokens)
+
+            if not 0 <= CHUNK_OVERLAP_TOKENS < self._size_tokens:
+                raise ValueError(
+                    "CHUNK_OVERLAP_TOKENS must be smaller than the chunk size "
+                    f"({self._size_tokens} tokens)"
+                )
+
+    def chunk(
+        self,
+        cleaned_text_path: Path,
+        metadata: Optional[Dict] = None,
+    ) -> List[Dict]:
         """
         Main entry point.
-        Returns a list of chunk dictionaries.
+        Returns a list of chunk dictionaries; `metadata` is added to each.
         """
         cleaned_text_path = Path(cleaned_text_path)
 
@@ -36,8 +69,29 @@ class TextChunker:
         return self._attach_metadata(
             chunks=chunks,
             source=str(cleaned_text_path),
+            metadata=metadata,
         )
 
+    def iter_chunks(
+        self,
+        texts: Iterable[str],
+        source: str,
+        metadata: Optional[Dict] = None,
+    ) -> Iterator[Dict]:
+        """
+        Streaming entry point.
+        Chunks text as it arrives (e.g. page by page), yielding each chunk
+        dictionary as soon as it is complete.
+        """
+        paragraphs = (
+            para
+            for text in texts
+            for para in self._split_into_paragraphs(text)
+        )
+
+        for idx, chunk in enumerate(self._iter_chunks(paragraphs)):
+            yield self._chunk_dict(chunk, source, idx, metadata)
+
     @staticmethod
     def _split_into_paragraphs(text: str) -> List[str]:
         """
@@ -49,7 +103,16 @@ class TextChunker:
         """
         Build chunks using paragraph-aware sliding window.
         """
-        chunks: List[str] = []
+        return list(self._iter_chunks(paragraphs))
+
+    def _iter_chunks(self, paragraphs: Iterable[str]) -> Iterator[str]:
+        """
+        Generator form of the paragraph-aware sliding window.
+        """
+        if self.mode == "tokens":
+            yield from self._iter_token_chunks(paragraphs)
+            return
+
         current_chunk: List[str] = []
         current_length = 0
 
@@ -59,25 +122,74 @@ class TextChunker:
             # If paragraph itself is too large, split it
             if para_length > CHUNK_SIZE:
                 if current_chunk:
-                    chunks.append(" ".join(current_chunk))
+                    yield from self._apply_overlap([" ".join(current_chunk)])
                     current_chunk = []
                     current_length = 0
 
-                chunks.extend(self._split_large_text(para))
+                yield from self._apply_overlap(self._split_large_text(para))
                 continue
 
             if current_length + para_length <= CHUNK_SIZE:
                 current_chunk.append(para)
                 current_length += para_length
             else:
-                chunks.append(" ".join(current_chunk))
+                yield from self._apply_overlap([" ".join(current_chunk)])
                 current_chunk = [para]
                 current_length = para_length
 
         if current_chunk:
-            chunks.append(" ".join(current_chunk))
+            yield from self._apply_overlap([" ".join(current_chunk)])
 
-        return self._apply_overlap(chunks)
+    def _iter_token_chunks(self, paragraphs: Iterable[str]) -> Iterator[str]:
+        """
+        Pack paragraphs into windows of CHUNK_SIZE_TOKENS tokens (capped at
+        the backend's input limit).
+
+        Each paragraph is tokenized once into per-token text pieces, and a
+        chunk is the concatenation of its pieces, so chunk text is exactly
+        the source text. A chunk is closed when the next paragraph does not
+        fit, and the following chunk starts with the last
+        CHUNK_OVERLAP_TOKENS tokens of the previous one. Paragraphs longer
+        than the window are split on token boundaries with the same overlap.
+        """
+        size, overlap = self._size_tokens, CHUNK_OVERLAP_TOKENS
+        separator = self._tokenizer.split("\n\n")
+
+        window: List[str] = []
+        # Leading tokens of `window` already emitted in the previous chunk
+        carried = 0
+
+        for para in paragraphs:
+            tokens = self._tokenizer.split(para)
+            if not tokens:
+                continue
+
+            if window and len(window) + len(separator) + len(tokens) > size:
+                if len(window) > carried:
+                    yield "".join(window).strip()
+                    window = window[-overlap:] if overlap else []
+                    carried = len(window)
+
+            if window:
+                if separator:
+                    window.extend(separator)
+                else:
+                    # Tokenizers that drop whitespace: keep it in the text
+                    tokens[0] = "\n\n" + tokens[0]
+            window.extend(tokens)
+
+            # Split oversized windows; `start` avoids re-copying the tail
+            start = 0
+            while len(window) - start > size:
+                yield "".join(window[start:start + size]).strip()
+                start += size - overlap
+
+            if start:
+                window = window[start:]
+                carried = min(overlap, len(window))
+
+        if len(window) > carried:
+            yield "".join(window).strip()
 
     def _split_large_text(self, text: str) -> List[str]:
         """
@@ -105,17 +217,28 @@ class TextChunker:
     def _attach_metadata(
         chunks: List[str],
         source: str,
+        metadata: Optional[Dict] = None,
     ) -> List[Dict]:
         """
         Attach metadata required for embeddings and retrieval.
         """
         return [
-            {
-                "text": chunk,
-                "metadata": {
-                    "source": source,
-                    "chunk_index": idx,
-                },
-            }
+            TextChunker._chunk_dict(chunk, source, idx, metadata)
             for idx, chunk in enumerate(chunks)
         ]
+
+    @staticmethod
+    def _chunk_dict(
+        chunk: str,
+        source: str,
+        idx: int,
+        metadata: Optional[Dict] = None,
+    ) -> Dict:
+        return {
+            "text": chunk,
+            "metadata": {
+                **(metadata or {}),
+                "source": source,
+                "chunk_index": idx,
+            },
+        }
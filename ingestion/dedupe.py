@@ -0,0 +1,400 @@
+# ingestion/dedupe.py
+
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import mmh3
+import numpy as np
+import xxhash
+
+from embeddings.scope import RetrievalScope
+from embeddings.vector_store import chunk_base_id
+from config.settings import (
+    DEDUPE_INDEX_PATH,
+    DEDUPE_THRESHOLD,
+    DEDUPE_SHINGLE_SIZE,
+    DEDUPE_NUM_PERM,
+    DEDUPE_BANDS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkDeduplicator:
+    """
+    Drops near-duplicate chunks before they are embedded.
+
+    Every chunk gets a MinHash signature over its word shingles. The
+    signature is split into `bands` LSH bands. A chunk is compared only
+    with stored chunks that share a band bucket, and it is skipped when
+    their estimated Jaccard similarity reaches `threshold`.
+
+    Kept chunks stay in a persistent sqlite index, so duplicates are found
+    within a document and across documents of the same tenant. Skipped
+    chunks are recorded as references to the chunk ID they duplicate, with
+    their document and tenant, so scoped retrieval can follow them.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEDUPE_INDEX_PATH,
+        threshold: float = DEDUPE_THRESHOLD,
+        shingle_size: int = DEDUPE_SHINGLE_SIZE,
+        num_perm: int = DEDUPE_NUM_PERM,
+        bands: int = DEDUPE_BANDS,
+    ):
+        if num_perm % bands:
+            raise ValueError("DEDUPE_NUM_PERM must be a multiple of DEDUPE_BANDS")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.shingle_size = max(1, shingle_size)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Fixed seed: signatures must stay comparable across runs
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                chunk_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS signatures_source ON signatures (source);
+
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                bucket TEXT NOT NULL,
+                chunk_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets (bucket);
+            CREATE INDEX IF NOT EXISTS lsh_buckets_chunk ON lsh_buckets (chunk_id);
+
+            CREATE TABLE IF NOT EXISTS duplicates (
+                source TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                kept_id TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                document TEXT,
+                tenant TEXT
+            );
+            CREATE INDEX IF NOT EXISTS duplicates_source ON duplicates (source);
+            CREATE INDEX IF NOT EXISTS duplicates_kept ON duplicates (kept_id);
+            """
+        )
+
+        # Indexes written by older versions lack the document and tenant
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(duplicates)")
+        }
+        for column in ("document", "tenant"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE duplicates ADD COLUMN {column} TEXT")
+
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS duplicates_document ON duplicates (document)"
+        )
+        self._conn.commit()
+
+    def dedupe(
+        self,
+        chunks: Iterable[Dict],
+        source: str,
+        counts: Optional[Counter] = None,
+        tenant: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """
+        Yield the chunks of `source` that are not near-duplicates.
+
+        The previous version of `source` is forgotten first, so a document
+        is never deduplicated against itself when it is ingested again.
+        `counts`, if given, receives "kept" and "duplicates" totals.
+        Chunks are only compared with chunks of the same `tenant`.
+        """
+        if counts is None:
+            counts = Counter()
+
+        source_key = self._source_key(source, tenant)
+        self.forget_source(source, tenant)
+
+        try:
+            for chunk in chunks:
+                signature = self.signature(chunk["text"])
+
+                if signature is None:
+                    counts["kept"] += 1
+                    yield chunk
+                    continue
+
+                with self._lock:
+                    match = self._best_match(signature, tenant)
+
+                    if match is not None:
+                        kept_id, similarity = match
+                        self._conn.execute(
+                            "INSERT INTO duplicates "
+                            "(source, chunk_index, text_hash, kept_id, "
+                            "similarity, document, tenant) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                source_key,
+                                chunk["metadata"].get("chunk_index", -1),
+                                xxhash.xxh3_64_hexdigest(
+                                    chunk["text"].encode("utf-8")
+                                ),
+                                kept_id,
+                                similarity,
+                                chunk["metadata"].get("document"),
+                                tenant,
+                            ),
+                        )
+                    else:
+                        self._add(
+                            chunk_base_id(source, chunk["text"], tenant),
+                            source_key,
+                            signature,
+                            tenant,
+                        )
+
+                if match is not None:
+                    counts["duplicates"] += 1
+                    continue
+
+                counts["kept"] += 1
+                yield chunk
+        finally:
+            with self._lock:
+                self._conn.commit()
+
+            if counts["duplicates"]:
+                logger.info(
+                    "%s: skipped %d near-duplicate chunks, kept %d",
+                    source_key,
+                    counts["duplicates"],
+                    counts["kept"],
+                )
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature (uint32, `num_perm` values) of the text's word
+        shingles, or None for empty text.
+        """
+        words = text.lower().split()
+        if not words:
+            return None
+
+        k = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+        hashes = np.fromiter(
+            (mmh3.hash(s, signed=False) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+        # Multiply-shift hashing; uint64 arithmetic wraps around
+        permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def forget_source(self, source: str, tenant: Optional[str] = None) -> List[str]:
+        """
+        Remove a source's signatures and duplicate records.
+
+        Returns the other sources (of the same tenant) whose skipped chunks
+        referenced chunks of `source`. Those references are dropped, so the
+        listed sources must be ingested again to store their copies.
+        """
+        prefix = self._source_key("", tenant)
+        source = self._source_key(source, tenant)
+
+        with self._lock:
+            chunk_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT chunk_id FROM signatures WHERE source = ?", (source,)
+                )
+            ]
+
+            affected = set()
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+
+                affected.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT DISTINCT source FROM duplicates "
+                        f"WHERE kept_id IN ({placeholders})",
+                        batch,
+                    )
+                )
+                self._conn.execute(
+                    f"DELETE FROM duplicates WHERE kept_id IN ({placeholders})",
+                    batch,
+                )
+                self._conn.execute(
+                    f"DELETE FROM lsh_buckets WHERE chunk_id IN ({placeholders})",
+                    batch,
+                )
+
+            self._conn.execute("DELETE FROM signatures WHERE source = ?", (source,))
+            self._conn.execute("DELETE FROM duplicates WHERE source = ?", (source,))
+            self._conn.commit()
+
+        affected.discard(source)
+        if affected:
+            logger.info(
+                "Chunks of %s were skipped as duplicates of %s, which is "
+                "being replaced",
+                sorted(affected),
+                source,
+            )
+
+        return sorted(key[len(prefix):] for key in affected)
+
+    def references(self, source: str, tenant: Optional[str] = None) -> List[Dict]:
+        """
+        Duplicate chunks skipped for `source` and the chunk IDs they point to.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_index, text_hash, kept_id, similarity "
+                "FROM duplicates WHERE source = ? ORDER BY chunk_index",
+                (self._source_key(source, tenant),),
+            ).fetchall()
+
+        return [
+            {
+                "chunk_index": chunk_index,
+                "text_hash": text_hash,
+                "kept_id": kept_id,
+                "similarity": similarity,
+            }
+            for chunk_index, text_hash, kept_id, similarity in rows
+        ]
+
+    def kept_ids(self, scope: RetrievalScope) -> Set[str]:
+        """
+        Chunk IDs referenced by the skipped chunks of the documents and
+        sources in `scope`.
+        """
+        return {row[0] for row in self._scope_rows("kept_id", scope)}
+
+    def documents(
+        self, scope: RetrievalScope
+    ) -> Set[Tuple[Optional[str], Optional[str]]]:
+        """
+        (tenant, document) pairs in `scope` with skipped chunks, including
+        documents none of whose chunks were stored.
+        """
+        return set(self._scope_rows("tenant, document", scope))
+
+    def _scope_rows(self, columns: str, scope: RetrievalScope) -> List[tuple]:
+        clauses = ["tenant IS ?"]
+        params: List = [scope.tenant]
+
+        if scope.documents:
+            clauses.append(f"document IN ({','.join('?' * len(scope.documents))})")
+            params.extend(scope.documents)
+        if scope.sources:
+            clauses.append(f"source IN ({','.join('?' * len(scope.sources))})")
+            params.extend(
+                self._source_key(source, scope.tenant) for source in scope.sources
+            )
+
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT DISTINCT {columns} FROM duplicates "
+                f"WHERE {' AND '.join(clauses)}",
+                params,
+            ).fetchall()
+
+    def stats(self) -> dict:
+        with self._lock:
+            signatures = self._conn.execute(
+                "SELECT COUNT(*) FROM signatures"
+            ).fetchone()[0]
+            duplicates = self._conn.execute(
+                "SELECT COUNT(*) FROM duplicates"
+            ).fetchone()[0]
+
+        return {"signatures": signatures, "duplicates": duplicates}
+
+    @staticmethod
+    def _source_key(source: str, tenant: Optional[str]) -> str:
+        return source if tenant is None else f"{tenant}/{source}"
+
+    def _buckets(self, signature: np.ndarray, tenant: Optional[str]) -> List[str]:
+        """
+        LSH bucket keys; namespaced by tenant so tenants never match.
+        """
+        namespace = b"" if tenant is None else tenant.encode("utf-8") + b"\0"
+        return [
+            xxhash.xxh3_64_hexdigest(
+                namespace
+                + band.to_bytes(2, "little")
+                + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            )
+            for band in range(self.bands)
+        ]
+
+    def _best_match(
+        self, signature: np.ndarray, tenant: Optional[str]
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Most similar stored chunk at or above the threshold, if any.
+        """
+        buckets = self._buckets(signature, tenant)
+        placeholders = ",".join("?" * len(buckets))
+
+        candidates = self._conn.execute(
+            f"SELECT s.chunk_id, s.signature FROM signatures s "
+            f"WHERE s.chunk_id IN ("
+            f"  SELECT chunk_id FROM lsh_buckets WHERE bucket IN ({placeholders})"
+            f")",
+            buckets,
+        ).fetchall()
+
+        best = None
+        for chunk_id, blob in candidates:
+            similarity = float(
+                np.mean(np.frombuffer(blob, dtype=np.uint32) == signature)
+            )
+            if similarity >= self.threshold and (
+                best is None or similarity > best[1]
+            ):
+                best = (chunk_id, similarity)
+
+        return best
+
+    def _add(
+        self,
+        chunk_id: str,
+        source: str,
+        signature: np.ndarray,
+        tenant: Optional[str],
+    ) -> None:
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO signatures (chunk_id, source, signature) "
+            "VALUES (?, ?, ?)",
+            (chunk_id, source, signature.tobytes()),
+        )
+        if cursor.rowcount:
+            self._conn.executemany(
+                "INSERT INTO lsh_buckets (bucket, chunk_id) VALUES (?, ?)",
+                [(bucket, chunk_id) for bucket in self._buckets(signature, tenant)],
+            )
@@ -0,0 +1,108 @@
+# ingestion/image_encoder.py
+
+import base64
+import time
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+
+from config.settings import (
+    OCR_IMAGE_FORMAT,
+    OCR_IMAGE_QUALITY,
+    OCR_IMAGE_MAX_DIMENSION,
+)
+
+
+@dataclass
+class EncodedImage:
+    data: str
+    mime_type: str
+    num_bytes: int
+    encode_ms: float
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
+
+
+class ImageEncoder:
+    """
+    Encodes preprocessed pages for the OCR request payload.
+
+    Formats:
+      - png: 8-bit lossless
+      - png1: 1-bit lossless, for thresholded (black/white) pages
+      - webp / jpeg: lossy, controlled by `quality`
+    """
+
+    MIME_TYPES = {
+        "png": "image/png",
+        "png1": "image/png",
+        "webp": "image/webp",
+        "jpeg": "image/jpeg",
+    }
+
+    def __init__(
+        self,
+        fmt: str = OCR_IMAGE_FORMAT,
+        quality: int = OCR_IMAGE_QUALITY,
+        max_dimension: Optional[int] = OCR_IMAGE_MAX_DIMENSION,
+    ):
+        if fmt not in self.MIME_TYPES:
+            raise ValueError(f"Unsupported OCR image format: {fmt}")
+
+        self.fmt = fmt
+        self.quality = quality
+        self.max_dimension = max_dimension
+
+    @property
+    def signature(self) -> str:
+        """
+        Identifies the encoding parameters (used in OCR cache keys).
+        """
+        quality = self.quality if self.fmt in ("webp", "jpeg") else "-"
+        return f"{self.fmt};q={quality};max={self.max_dimension}"
+
+    def encode(self, image: Image.Image) -> EncodedImage:
+        start = time.perf_counter()
+
+        image = self._downscale(image)
+        buffer = BytesIO()
+
+        if self.fmt == "png1":
+            image = image.convert("L").point(
+                lambda p: 255 if p >= 128 else 0, mode="1"
+            )
+            image.save(buffer, format="PNG")
+        elif self.fmt == "png":
+            image.save(buffer, format="PNG")
+        elif self.fmt == "webp":
+            image.save(buffer, format="WEBP", quality=self.quality)
+        else:
+            image.convert("L").save(buffer, format="JPEG", quality=self.quality)
+
+        raw = buffer.getvalue()
+
+        return EncodedImage(
+            data=base64.b64encode(raw).decode("utf-8"),
+            mime_type=self.MIME_TYPES[self.fmt],
+            num_bytes=len(raw),
+            encode_ms=1000 * (time.perf_counter() - start),
+        )
+
+    def _downscale(self, image: Image.Image) -> Image.Image:
+        if not self.max_dimension:
+            return image
+
+        longest = max(image.size)
+        if longest <= self.max_dimension:
+            return image
+
+        scale = self.max_dimension / longest
+        size = (
+            max(1, round(image.width * scale)),
+            max(1, round(image.height * scale)),
+        )
+        return image.resize(size, Image.Resampling.LANCZOS)
@@ -1,39 +1,105 @@
 # ingestion/loader.py
 
-from pathlib import Path
-from typing import Union, BinaryIO
+import os
 import shutil
-import pdfplumber
+from pathlib import Path
+from typing import Union, BinaryIO, Tuple
+
+import xxhash
+
+from config.settings import RAW_DATA_DIR, LOCAL_FILE_MODE
+
 
-from config.settings import RAW_DATA_DIR
+# Streaming block size for uploads, copies and hashing
+BLOCK_SIZE = 1024 * 1024
 
 
 class DocumentLoader:
     """
-    Loads uploaded documents and detects if OCR is required.
+    Loads uploaded documents into RAW_DATA_DIR.
+
+    Uploads are streamed to RAW_DATA_DIR in blocks, hashing the content on
+    the fly. Local files are copied, hard-linked, or referenced in place
+    depending on `local_file_mode` ("copy", "hardlink" or "reference").
     """
 
+    def __init__(self, local_file_mode: str = LOCAL_FILE_MODE):
+        if local_file_mode not in ("copy", "hardlink", "reference"):
+            raise ValueError(f"Unsupported local file mode: {local_file_mode}")
+
+        self.local_file_mode = local_file_mode
+
     def load(self, file: Union[str, Path, BinaryIO]) -> Path:
+        return self.load_with_hash(file)[0]
+
+    def load_with_hash(self, file: Union[str, Path, BinaryIO]) -> Tuple[Path, str]:
+        """
+        Load a document and return its stored path and content hash.
+        """
         RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
         if hasattr(file, "read"):  # Streamlit upload
-            output_path = RAW_DATA_DIR / file.name
-            with open(output_path, "wb") as f:
-                f.write(file.read())
-        else:
-            file = Path(file)
-            output_path = RAW_DATA_DIR / file.name
-            shutil.copy(file, output_path)
+            output_path = RAW_DATA_DIR / Path(file.name).name
+            if hasattr(file, "seek"):
+                file.seek(0)
+            return output_path, self._write_stream(file, output_path)
+
+        file = Path(file)
+        output_path = RAW_DATA_DIR / file.name
 
-        return output_path
+        if self.local_file_mode == "reference":
+            return file.resolve(), self.file_hash(file)
+
+        if output_path.exists() and os.path.samefile(file, output_path):
+            return output_path, self.file_hash(output_path)
+
+        if self.local_file_mode == "hardlink":
+            try:
+                tmp_path = self._tmp_path(output_path)
+                os.link(file, tmp_path)
+                os.replace(tmp_path, output_path)
+                return output_path, self.file_hash(output_path)
+            except OSError:
+                # Different filesystem or links unsupported: fall back to copy
+                pass
+
+        with open(file, "rb") as src:
+            file_hash = self._write_stream(src, output_path)
+        shutil.copystat(file, output_path)
+
+        return output_path, file_hash
 
     @staticmethod
-    def is_text_pdf(pdf_path: Path) -> bool:
+    def file_hash(file_path: Path) -> str:
+        hasher = xxhash.xxh3_128()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _write_stream(self, stream: BinaryIO, output_path: Path) -> str:
+        """
+        Copy a stream to output_path block by block, returning its hash.
+        Written to a temporary file first so readers never see partial data.
+        """
+        hasher = xxhash.xxh3_128()
+        tmp_path = self._tmp_path(output_path)
+
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages[:2]:
-                    if page.extract_text():
-                        return True
-        except Exception:
-            pass
-        return False
+            with open(tmp_path, "wb") as f:
+                for block in iter(lambda: stream.read(BLOCK_SIZE), b""):
+                    hasher.update(block)
+                    f.write(block)
+            os.replace(tmp_path, output_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _tmp_path(output_path: Path) -> Path:
+        tmp_path = output_path.with_name(f".{output_path.name}.part")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return tmp_path
@@ -0,0 +1,114 @@
+# ingestion/manifest.py
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from config.settings import MANIFEST_PATH, LEGACY_MANIFEST_PATH
+
+
+class IngestionManifest:
+    """
+    Records the content hash of every ingested file so that unchanged
+    files can be skipped when they are ingested again.
+
+    Entries live in a sqlite table, so every instance (and process) sees
+    the same entries and recording a file writes only its own row.
+
+    Entries also record the SCHEMA_VERSION they were written with. Files
+    ingested under an older schema count as changed, so they are processed
+    again and their chunks pick up the current metadata.
+    """
+
+    # Bumped whenever stored chunks need data only a re-ingest can add
+    # (2: "document"/"tenant" chunk metadata and document summaries)
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        path: Path = MANIFEST_PATH,
+        legacy_path: Optional[Path] = LEGACY_MANIFEST_PATH,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                entry TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        if legacy_path is not None:
+            self._import_legacy(Path(legacy_path))
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entry FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def is_unchanged(self, key: str, file_hash: str) -> bool:
+        entry = self.get(key)
+        return (
+            entry is not None
+            and entry.get("file_hash") == file_hash
+            and entry.get("schema") == self.SCHEMA_VERSION
+        )
+
+    def items(self) -> List[Tuple[str, dict]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, entry FROM entries").fetchall()
+        return [(key, json.loads(entry)) for key, entry in rows]
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """
+        Forget files so they are ingested again even if unchanged.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM entries WHERE key = ?", [(key,) for key in keys]
+            )
+            self._conn.commit()
+
+    def record(self, key: str, file_hash: str, **info) -> None:
+        entry = {
+            "file_hash": file_hash,
+            "schema": self.SCHEMA_VERSION,
+            "ingested_at": time.time(),
+            **info,
+        }
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, entry) VALUES (?, ?)",
+                (key, json.dumps(entry)),
+            )
+            self._conn.commit()
+
+    def _import_legacy(self, legacy_path: Path) -> None:
+        """
+        Move the entries of a JSON manifest into the table, once.
+        """
+        if not legacy_path.exists():
+            return
+
+        entries = json.loads(legacy_path.read_text(encoding="utf-8"))
+        with self._lock:
+            # Keep entries already recorded in sqlite
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, entry) VALUES (?, ?)",
+                [(key, json.dumps(entry)) for key, entry in entries.items()],
+            )
+            self._conn.commit()
+
+        legacy_path.rename(legacy_path.with_suffix(".json.imported"))
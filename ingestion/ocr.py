@@ -1,65 +1,270 @@
 # ingestion/ocr.py
 
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from openai import OpenAI
+from typing import Iterable, Iterator, Optional, Sequence
+
+import xxhash
 from PIL import Image
-from pdf2image import convert_from_path
 
+from clients.factory import get_client, is_transient_error
+from embeddings.cache import SQLiteLRUStore
+from ingestion.image_encoder import ImageEncoder
 from ingestion.image_preprocessor import ImagePreprocessor
+from ingestion.pdf_rasterizer import PDFRasterizer
 from ingestion.pdf_text_extractor import PDFTextExtractor
-from ingestion.loader import DocumentLoader
-from config.settings import DEEPSEEK_API_KEY, OCR_DATA_DIR
+from ingestion.preprocess_pool import PreprocessPool
+from ingestion.text_readers import NativeTextReader
+from config.settings import (
+    OCR_DATA_DIR,
+    OCR_CACHE_ENABLED,
+    OCR_CACHE_PATH,
+    OCR_CACHE_MAX_BYTES,
+    OCR_MAX_CONCURRENCY,
+    OCR_PREPROCESS_WORKERS,
+    OCR_MAX_RETRIES,
+    OCR_RETRY_BACKOFF_SECONDS,
+)
 
 
-client = OpenAI(
-    api_key=DEEPSEEK_API_KEY,
-    base_url="https://api.deepinfra.com/v1/openai",
-)
+logger = logging.getLogger(__name__)
+
+# Retries happen per page in DeepSeekOCR._ocr_page, not in the SDK as well
+client = get_client("deepinfra").with_options(max_retries=0)
 
 OCR_MODEL = "deepseek-ai/DeepSeek-OCR"
 
 
+class OCRCache:
+    """
+    Persistent, content-addressed cache of OCR results.
+
+    Keys hash the preprocessed page pixels together with the preprocessing
+    parameters and model name, so identical pages are only OCR'd once.
+    Least-recently-used entries are evicted once the stored text exceeds
+    `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: Path = OCR_CACHE_PATH,
+        max_bytes: int = OCR_CACHE_MAX_BYTES,
+    ):
+        self._store = SQLiteLRUStore(
+            path, "ocr_cache", {"text": "TEXT NOT NULL"}, max_bytes
+        )
+
+    @staticmethod
+    def make_key(image: Image.Image, *params: str) -> str:
+        hasher = xxhash.xxh3_128()
+        for param in params:
+            hasher.update(param.encode("utf-8"))
+            hasher.update(b"\0")
+        hasher.update(f"{image.mode}:{image.size}".encode("utf-8"))
+        hasher.update(image.tobytes())
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._store.get_many([key]).get(key)
+        return row[0] if row is not None else None
+
+    def put(self, key: str, text: str) -> None:
+        self._store.put_many([(key, len(text.encode("utf-8")), text)])
+
+    def stats(self) -> dict:
+        return self._store.stats()
+
+
 class DeepSeekOCR:
     """
     OCR pipeline with smart PDF detection.
+
+    Text-native formats (txt, md, html, docx) are read directly and never
+    reach the OCR API. Page preprocessing runs in a process pool shared by
+    all instances (OCR_PREPROCESS_WORKERS), created on first use.
     """
 
-    def __init__(self):
+    _preprocess_pool = None
+    _preprocess_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_concurrency: int = OCR_MAX_CONCURRENCY,
+        preprocess_workers: int = OCR_PREPROCESS_WORKERS,
+    ):
         self.preprocessor = ImagePreprocessor()
+        self.encoder = ImageEncoder()
         self.pdf_text_extractor = PDFTextExtractor()
+        self.text_reader = NativeTextReader()
+        self.rasterizer = PDFRasterizer(upscale=self.preprocessor.upscale)
+        self.max_concurrency = max(1, max_concurrency)
+        self.preprocess_workers = preprocess_workers
+        self.cache = OCRCache() if OCR_CACHE_ENABLED else None
 
     def run(self, file_path: Path) -> Path:
         file_path = Path(file_path)
         OCR_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-        # ✅ If PDF has text → extract directly
-        if file_path.suffix.lower() == ".pdf" and DocumentLoader.is_text_pdf(file_path):
-            text = self.pdf_text_extractor.extract(file_path)
-
-        # ❌ Otherwise → OCR
-        else:
-            text = self._ocr_file(file_path)
+        text = "\n\n".join(t for t in self.iter_pages(file_path) if t).strip()
 
         output_path = OCR_DATA_DIR / f"{file_path.stem}.txt"
         output_path.write_text(text, encoding="utf-8")
+
+        if self.cache is not None:
+            logger.info("OCR cache stats: %s", self.cache.stats())
+
         return output_path
 
-    def _ocr_file(self, file_path: Path) -> str:
-        texts = []
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        """
+        Yield the text of each page in order, as soon as it is available.
+        """
+        file_path = Path(file_path)
 
-        if file_path.suffix.lower() == ".pdf":
-            pages = convert_from_path(file_path, dpi=300)
-            for page in pages:
-                texts.append(self._ocr_image(page))
+        # Text-native formats → read directly
+        if self.text_reader.supports(file_path):
+            yield from self.text_reader.iter_blocks(file_path)
+
+        # PDF → text layer where present, OCR only for scanned pages
+        elif file_path.suffix.lower() == ".pdf":
+            yield from self._iter_pdf_pages(file_path)
+
+        # Image → OCR
         else:
-            image = Image.open(file_path)
-            texts.append(self._ocr_image(image))
+            yield from self._ocr_pages([Image.open(file_path)])
+
+    def _iter_pdf_pages(self, file_path: Path) -> Iterator[str]:
+        """
+        Classify each page and OCR only those without a usable text layer.
+        """
+        page_texts = self.pdf_text_extractor.extract_pages(file_path)
+        ocr_indices = [i for i, text in enumerate(page_texts) if text is None]
+
+        if not ocr_indices:
+            yield from page_texts
+            return
+
+        logger.info(
+            "%s: %d of %d pages need OCR",
+            file_path.name,
+            len(ocr_indices),
+            len(page_texts),
+        )
+
+        # Rendered lazily: OCR of early pages overlaps rendering of later ones
+        pages = self.rasterizer.iter_pages(file_path, ocr_indices)
+        ocr_texts = self._ocr_pages(pages, [i + 1 for i in ocr_indices])
+
+        for text in page_texts:
+            yield next(ocr_texts) if text is None else text
+
+    def _ocr_pages(
+        self,
+        pages: Iterable[Image.Image],
+        page_numbers: Optional[Sequence[int]] = None,
+    ) -> Iterator[str]:
+        """
+        OCR pages concurrently, yielding results in the original page order.
+
+        At most `max_concurrency` pages are in flight; the next page is only
+        submitted once the oldest pending one has been collected.
+        """
+        if page_numbers is None:
+            page_numbers = itertools.count(1)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = deque()
 
-        return "\n\n".join(texts)
+            for page_number, page in zip(page_numbers, pages):
+                pending.append(
+                    executor.submit(self._ocr_page, page, page_number)
+                )
+                if len(pending) >= self.max_concurrency:
+                    yield pending.popleft().result()
 
-    def _ocr_image(self, image: Image.Image) -> str:
-        processed = self.preprocessor.preprocess(image)
-        encoded = self._encode_image(processed)
+            while pending:
+                yield pending.popleft().result()
+
+    def _ocr_page(self, image: Image.Image, page_number: int) -> str:
+        """
+        OCR a single page, retrying transient API failures with backoff.
+        Other errors are raised immediately.
+        """
+        for attempt in range(OCR_MAX_RETRIES + 1):
+            try:
+                return self._ocr_image(image, page_number)
+            except Exception as e:
+                if not is_transient_error(e):
+                    raise RuntimeError(
+                        f"OCR failed for page {page_number}: {e}"
+                    ) from e
+
+                if attempt == OCR_MAX_RETRIES:
+                    raise RuntimeError(
+                        f"OCR failed for page {page_number} "
+                        f"after {attempt + 1} attempts: {e}"
+                    ) from e
+
+                delay = OCR_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+                logger.warning(
+                    "OCR failed for page %d (attempt %d), retrying in %.1fs: %s",
+                    page_number,
+                    attempt + 1,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+
+    def _preprocess(self, image: Image.Image) -> Image.Image:
+        if self.preprocess_workers <= 1:
+            return self.preprocessor.preprocess(image)
+
+        with DeepSeekOCR._preprocess_pool_lock:
+            pool = DeepSeekOCR._preprocess_pool
+            if pool is None:
+                pool = DeepSeekOCR._preprocess_pool = PreprocessPool(
+                    profile=self.preprocessor.profile,
+                    workers=self.preprocess_workers,
+                )
+
+        try:
+            return pool.preprocess(image)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next attempt
+            with DeepSeekOCR._preprocess_pool_lock:
+                if DeepSeekOCR._preprocess_pool is pool:
+                    DeepSeekOCR._preprocess_pool = None
+            raise
+
+    def _ocr_image(self, image: Image.Image, page_number: int = 1) -> str:
+        processed = self._preprocess(image)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = OCRCache.make_key(
+                processed,
+                OCR_MODEL,
+                self.preprocessor.signature,
+                self.encoder.signature,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        encoded = self.encoder.encode(processed)
+        logger.info(
+            "Page %d: %s payload %.1f KB, encoded in %.1f ms",
+            page_number,
+            self.encoder.fmt,
+            encoded.num_bytes / 1024,
+            encoded.encode_ms,
+        )
 
         response = client.chat.completions.create(
             model=OCR_MODEL,
@@ -71,7 +276,7 @@ class DeepSeekOCR:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{encoded}"
+                                "url": encoded.data_url
                             },
                         }
                     ],
@@ -79,13 +284,9 @@ class DeepSeekOCR:
             ],
         )
 
-        return response.choices[0].message.content.strip()
+        text = response.choices[0].message.content.strip()
 
-    @staticmethod
-    def _encode_image(image: Image.Image) -> str:
-        import base64
-        from io import BytesIO
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
 
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return text
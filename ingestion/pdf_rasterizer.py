@@ -0,0 +1,178 @@
+# ingestion/pdf_rasterizer.py
+
+import math
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from config.settings import (
+    OCR_DPI,
+    OCR_RASTER_BACKEND,
+    OCR_ADAPTIVE_DPI,
+    OCR_PROBE_DPI,
+    OCR_MIN_DPI,
+    OCR_TARGET_XHEIGHT_PX,
+)
+
+
+class PDFRasterizer:
+    """
+    Renders PDF pages to images one page at a time.
+
+    Only the page currently being rendered is held in memory, so peak usage
+    does not grow with the length of the document.
+
+    In adaptive mode each page is first rendered at a low probe DPI to
+    estimate its x-height, and then at the smallest DPI that still meets the
+    target x-height after preprocessing (`upscale` is the preprocessor's
+    resize factor).
+    """
+
+    # Minimum number of glyph-like components for a trustworthy estimate
+    MIN_GLYPHS = 20
+
+    def __init__(
+        self,
+        backend: str = OCR_RASTER_BACKEND,
+        dpi: int = OCR_DPI,
+        adaptive: bool = OCR_ADAPTIVE_DPI,
+        upscale: float = 1.0,
+    ):
+        if backend not in ("pdfium", "poppler"):
+            raise ValueError(f"Unsupported rasterizer backend: {backend}")
+
+        self.backend = backend
+        self.dpi = dpi
+        self.adaptive = adaptive
+        self.upscale = upscale
+
+    def page_count(self, pdf_path: Path) -> int:
+        if self.backend == "pdfium":
+            import pypdfium2 as pdfium
+
+            pdf = pdfium.PdfDocument(str(pdf_path))
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+
+        from pdf2image import pdfinfo_from_path
+
+        return int(pdfinfo_from_path(str(pdf_path))["Pages"])
+
+    def iter_pages(
+        self,
+        pdf_path: Path,
+        page_indices: Optional[Sequence[int]] = None,
+    ) -> Iterator[Image.Image]:
+        """
+        Lazily render pages (0-based indices, all pages by default).
+        """
+        if self.backend == "pdfium":
+            yield from self._iter_pdfium(pdf_path, page_indices)
+        else:
+            yield from self._iter_poppler(pdf_path, page_indices)
+
+    def _iter_pdfium(
+        self,
+        pdf_path: Path,
+        page_indices: Optional[Sequence[int]],
+    ) -> Iterator[Image.Image]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            if page_indices is None:
+                page_indices = range(len(pdf))
+
+            for index in page_indices:
+                page = pdf[index]
+                try:
+                    dpi = self.dpi
+                    if self.adaptive:
+                        probe = page.render(scale=OCR_PROBE_DPI / 72).to_pil()
+                        dpi = self.choose_dpi(probe)
+
+                    image = page.render(scale=dpi / 72).to_pil()
+                finally:
+                    page.close()
+
+                yield image
+        finally:
+            pdf.close()
+
+    def _iter_poppler(
+        self,
+        pdf_path: Path,
+        page_indices: Optional[Sequence[int]],
+    ) -> Iterator[Image.Image]:
+        from pdf2image import convert_from_path
+
+        if page_indices is None:
+            page_indices = range(self.page_count(pdf_path))
+
+        for index in page_indices:
+            # pdf2image page numbers are 1-based and inclusive
+            dpi = self.dpi
+            if self.adaptive:
+                probe = convert_from_path(
+                    pdf_path,
+                    dpi=OCR_PROBE_DPI,
+                    first_page=index + 1,
+                    last_page=index + 1,
+                )[0]
+                dpi = self.choose_dpi(probe)
+
+            yield convert_from_path(
+                pdf_path,
+                dpi=dpi,
+                first_page=index + 1,
+                last_page=index + 1,
+            )[0]
+
+    def choose_dpi(self, probe: Image.Image) -> int:
+        """
+        Smallest DPI that reaches the target x-height, given a probe
+        rendered at OCR_PROBE_DPI. Falls back to the full DPI when no
+        reliable estimate can be made.
+        """
+        xheight = self.estimate_xheight(probe)
+        if xheight is None:
+            return self.dpi
+
+        dpi = OCR_PROBE_DPI * OCR_TARGET_XHEIGHT_PX / (xheight * self.upscale)
+
+        # Round up to a multiple of 10 to stay on the safe side
+        dpi = int(math.ceil(dpi / 10.0) * 10)
+        return max(OCR_MIN_DPI, min(self.dpi, dpi))
+
+    @classmethod
+    def estimate_xheight(cls, image: Image.Image) -> Optional[float]:
+        """
+        Median height (pixels) of glyph-like connected components.
+        """
+        gray = np.array(image.convert("L"))
+        _, binary = cv2.threshold(
+            gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU
+        )
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+        # Skip the background label
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+
+        # Drop specks, rules, images and merged blobs
+        glyphs = (
+            (heights >= 2)
+            & (heights <= gray.shape[0] * 0.05)
+            & (widths <= heights * 3)
+        )
+
+        if glyphs.sum() < cls.MIN_GLYPHS:
+            return None
+
+        return float(np.median(heights[glyphs]))
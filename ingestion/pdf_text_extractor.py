@@ -1,21 +1,219 @@
 # ingestion/pdf_text_extractor.py
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Tuple
 import pdfplumber
 
+from ingestion.process_context import worker_context
+from config.settings import (
+    PDF_MIN_TEXT_CHARS,
+    PDF_MIN_IMAGE_COVERAGE,
+    PDF_SCANNED_IMAGE_COVERAGE,
+    PDF_MIN_TEXT_CHARS_ON_SCANNED,
+    PDF_EXTRACT_BACKEND,
+    PDF_EXTRACT_WORKERS,
+    PDF_EXTRACT_PAGES_PER_TASK,
+)
+
+
+# (page text, fraction of the page covered by images)
+PageInfo = Tuple[str, float]
+
 
 class PDFTextExtractor:
     """
     Extracts text from digitally-generated PDFs (no OCR).
+
+    Backends: "pdfplumber" or "pdfium" (pypdfium2, much faster). Documents
+    longer than one task are split into page ranges that are extracted in
+    a process pool; every page is released as soon as it has been read.
     """
 
-    def extract(self, pdf_path: Path) -> str:
-        text_pages = []
+    def __init__(
+        self,
+        backend: str = PDF_EXTRACT_BACKEND,
+        workers: int = PDF_EXTRACT_WORKERS,
+        pages_per_task: int = PDF_EXTRACT_PAGES_PER_TASK,
+    ):
+        if backend not in ("pdfplumber", "pdfium"):
+            raise ValueError(f"Unsupported PDF extraction backend: {backend}")
 
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_pages.append(page_text)
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
 
+    def extract(self, pdf_path: Path) -> str:
+        text_pages = [text for text, _ in self._page_infos(pdf_path) if text]
         return "\n\n".join(text_pages).strip()
+
+    def extract_pages(self, pdf_path: Path) -> List[Optional[str]]:
+        """
+        Classify every page individually.
+
+        Returns one entry per page: the text layer for digital pages,
+        or None for pages that need OCR.
+        """
+        return [
+            None if self._needs_ocr(text, coverage) else text
+            for text, coverage in self._page_infos(pdf_path)
+        ]
+
+    def _page_infos(self, pdf_path: Path) -> List[PageInfo]:
+        pdf_path = str(pdf_path)
+        num_pages = _page_count(pdf_path, self.backend)
+
+        ranges = [
+            (start, min(start + self.pages_per_task, num_pages))
+            for start in range(0, num_pages, self.pages_per_task)
+        ]
+
+        if self.workers == 1 or len(ranges) <= 1:
+            return [
+                info
+                for start, stop in ranges
+                for info in _extract_range(pdf_path, self.backend, start, stop)
+            ]
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(ranges)),
+            mp_context=worker_context(),
+        ) as executor:
+            results = executor.map(
+                _extract_range,
+                [pdf_path] * len(ranges),
+                [self.backend] * len(ranges),
+                [start for start, _ in ranges],
+                [stop for _, stop in ranges],
+            )
+            return [info for infos in results for info in infos]
+
+    @staticmethod
+    def _needs_ocr(page_text: str, image_coverage: float) -> bool:
+        num_chars = len(page_text.strip())
+
+        # Short pages only hold text worth OCR'ing if they contain images;
+        # otherwise they are blank, title or separator pages
+        if num_chars < PDF_MIN_TEXT_CHARS:
+            return image_coverage >= PDF_MIN_IMAGE_COVERAGE
+
+        # Scanned page with only a header/footer or page number as real text
+        return (
+            image_coverage >= PDF_SCANNED_IMAGE_COVERAGE
+            and num_chars < PDF_MIN_TEXT_CHARS_ON_SCANNED
+        )
+
+
+# Module-level so they can run in worker processes
+
+def _page_count(pdf_path: str, backend: str) -> int:
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_range(
+    pdf_path: str,
+    backend: str,
+    start: int,
+    stop: int,
+) -> List[PageInfo]:
+    """
+    Extract pages [start, stop) (0-based).
+    """
+    if backend == "pdfium":
+        return _extract_range_pdfium(pdf_path, start, stop)
+
+    return _extract_range_pdfplumber(pdf_path, start, stop)
+
+
+def _extract_range_pdfplumber(pdf_path: str, start: int, stop: int) -> List[PageInfo]:
+    infos = []
+
+    # pdfplumber page numbers are 1-based
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            infos.append((page.extract_text() or "", _image_coverage(page)))
+            # Drop the cached layout objects of pages already read
+            page.close()
+
+    return infos
+
+
+def _extract_range_pdfium(pdf_path: str, start: int, stop: int) -> List[PageInfo]:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    infos = []
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    # get_text_range keeps pdfium's generated line breaks
+                    # (get_text_bounded drops them, gluing words together);
+                    # U+FFFE marks a soft hyphen that ended a line
+                    text = (
+                        textpage.get_text_range()
+                        .replace("\r\n", "\n")
+                        .replace("\ufffe", "-\n")
+                    )
+                finally:
+                    textpage.close()
+
+                width, height = page.get_size()
+                # (left, bottom, right, top) in PDF points
+                boxes = [
+                    obj.get_bounds()
+                    for obj in page.get_objects(
+                        filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)
+                    )
+                ]
+            finally:
+                page.close()
+
+            infos.append((text.strip(), _box_coverage(boxes, width, height)))
+    finally:
+        pdf.close()
+
+    return infos
+
+
+def _image_coverage(page) -> float:
+    """
+    Fraction of a pdfplumber page's area covered by embedded images.
+    """
+    boxes = [
+        (img["x0"], img["top"], img["x1"], img["bottom"])
+        for img in page.images
+    ]
+    return _box_coverage(boxes, page.width, page.height)
+
+
+def _box_coverage(boxes, width: float, height: float) -> float:
+    """
+    Fraction of a width x height page covered by (x0, y0, x1, y1) boxes.
+    """
+    page_area = float(width * height)
+    if page_area <= 0:
+        return 0.0
+
+    covered = 0.0
+    for x0, y0, x1, y1 in boxes:
+        box_width = min(x1, width) - max(x0, 0)
+        box_height = min(y1, height) - max(y0, 0)
+        if box_width > 0 and box_height > 0:
+            covered += box_width * box_height
+
+    return min(covered / page_area, 1.0)
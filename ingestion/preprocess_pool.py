@@ -0,0 +1,104 @@
+# ingestion/preprocess_pool.py
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ingestion.image_preprocessor import ImagePreprocessor
+from ingestion.process_context import worker_context
+from config.settings import OCR_PREPROCESS_PROFILE, OCR_PREPROCESS_WORKERS
+
+
+# (shared memory block name, array shape, dtype)
+SharedArray = Tuple[str, Tuple[int, ...], str]
+
+
+class PreprocessPool:
+    """
+    Runs ImagePreprocessor in worker processes.
+
+    Page pixels travel through shared memory blocks instead of being
+    pickled: the caller copies the page into a block, the worker reads it
+    in place and writes its result into a new block that the caller copies
+    out and releases. `preprocess` blocks only the calling thread, so OCR
+    threads keep requests in flight while other pages are preprocessed on
+    every core.
+    """
+
+    def __init__(
+        self,
+        profile: str = OCR_PREPROCESS_PROFILE,
+        workers: int = OCR_PREPROCESS_WORKERS,
+    ):
+        self.profile = profile
+        self.workers = max(1, workers)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=worker_context(),
+            initializer=_init_worker,
+            initargs=(profile,),
+        )
+
+    def preprocess(self, image: Image.Image) -> Image.Image:
+        pixels = np.asarray(image)
+
+        source = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+        try:
+            np.ndarray(pixels.shape, dtype=pixels.dtype, buffer=source.buf)[...] = pixels
+
+            name, shape, dtype = self._executor.submit(
+                _preprocess_shared,
+                (source.name, pixels.shape, pixels.dtype.str),
+            ).result()
+        finally:
+            source.close()
+            source.unlink()
+
+        result = shared_memory.SharedMemory(name=name)
+        try:
+            processed = np.ndarray(shape, dtype=dtype, buffer=result.buf).copy()
+        finally:
+            result.close()
+            result.unlink()
+
+        return Image.fromarray(processed)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+# Module-level so they can run in worker processes
+
+_preprocessor = None
+
+
+def _init_worker(profile: str) -> None:
+    global _preprocessor
+
+    # Parallelism comes from the pool; avoid oversubscribing cores
+    cv2.setNumThreads(1)
+    _preprocessor = ImagePreprocessor(profile=profile)
+
+
+def _preprocess_shared(source: SharedArray) -> SharedArray:
+    name, shape, dtype = source
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        pixels = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        processed = _preprocessor.preprocess_array(pixels)
+        del pixels
+    finally:
+        block.close()
+
+    # Owned by the caller from here on, which unlinks it after copying
+    result = shared_memory.SharedMemory(create=True, size=max(1, processed.nbytes))
+    np.ndarray(processed.shape, dtype=processed.dtype, buffer=result.buf)[...] = processed
+    result.close()
+
+    return result.name, processed.shape, processed.dtype.str
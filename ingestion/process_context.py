@@ -0,0 +1,18 @@
+# ingestion/process_context.py
+
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+
+def worker_context() -> BaseContext:
+    """
+    Start method for ingestion worker pools.
+
+    forkserver (spawn where unavailable): workers are never forked from a
+    process that is running OCR or ingestion pipeline threads, which could
+    leave locks held in the child.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
@@ -2,6 +2,7 @@
 
 import re
 from pathlib import Path
+from typing import Iterable, Iterator
 from config.settings import PROCESSED_DATA_DIR
 
 
@@ -13,15 +14,26 @@ class TextCleaner:
     def clean(self, ocr_text_path: Path) -> Path:
         raw_text = ocr_text_path.read_text(encoding="utf-8", errors="ignore")
 
+        output_path = PROCESSED_DATA_DIR / ocr_text_path.name
+        output_path.write_text(self.clean_text(raw_text), encoding="utf-8")
+
+        return output_path
+
+    def clean_text(self, raw_text: str) -> str:
         text = self._remove_non_english(raw_text)
         text = self._fix_hyphenation(text)
         text = self._normalize_whitespace(text)
         text = self._remove_noise_lines(text)
+        return text.strip()
 
-        output_path = PROCESSED_DATA_DIR / ocr_text_path.name
-        output_path.write_text(text.strip(), encoding="utf-8")
-
-        return output_path
+    def clean_pages(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Clean pages one at a time, dropping pages left empty.
+        """
+        for page in pages:
+            text = self.clean_text(page)
+            if text:
+                yield text
 
     @staticmethod
     def _remove_non_english(text: str) -> str:
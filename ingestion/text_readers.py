@@ -0,0 +1,165 @@
+# ingestion/text_readers.py
+
+import zipfile
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable, Iterator, List
+from xml.etree import ElementTree
+
+from config.settings import TEXT_READER_BLOCK_CHARS
+
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class NativeTextReader:
+    """
+    Streams text out of text-native formats (txt, md, html, docx) so they
+    can skip rasterization and OCR entirely.
+
+    Text is yielded in blocks of roughly TEXT_READER_BLOCK_CHARS characters,
+    split on paragraph boundaries, which downstream stages treat like pages.
+    """
+
+    SUFFIXES = {".txt", ".md", ".markdown", ".html", ".htm", ".docx"}
+
+    def __init__(self, block_chars: int = TEXT_READER_BLOCK_CHARS):
+        self.block_chars = block_chars
+
+    def supports(self, file_path: Path) -> bool:
+        return Path(file_path).suffix.lower() in self.SUFFIXES
+
+    def iter_blocks(self, file_path: Path) -> Iterator[str]:
+        file_path = Path(file_path)
+        suffix = file_path.suffix.lower()
+
+        if suffix in (".html", ".htm"):
+            paragraphs = self._html_paragraphs(file_path)
+        elif suffix == ".docx":
+            paragraphs = self._docx_paragraphs(file_path)
+        else:
+            paragraphs = self._plain_paragraphs(file_path)
+
+        yield from self._blocks(paragraphs)
+
+    def _blocks(self, paragraphs: Iterable[str]) -> Iterator[str]:
+        block: List[str] = []
+        length = 0
+
+        for para in paragraphs:
+            para = para.strip()
+            if not para:
+                continue
+
+            block.append(para)
+            length += len(para)
+
+            if length >= self.block_chars:
+                yield "\n\n".join(block)
+                block, length = [], 0
+
+        if block:
+            yield "\n\n".join(block)
+
+    @staticmethod
+    def _plain_paragraphs(file_path: Path) -> Iterator[str]:
+        """
+        Blank-line separated paragraphs of a txt/md file, read line by line.
+        """
+        lines: List[str] = []
+
+        with open(file_path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                if line.strip():
+                    lines.append(line.rstrip("\n"))
+                elif lines:
+                    yield "\n".join(lines)
+                    lines = []
+
+        if lines:
+            yield "\n".join(lines)
+
+    @staticmethod
+    def _html_paragraphs(file_path: Path) -> Iterator[str]:
+        parser = _HTMLTextParser()
+
+        with open(file_path, encoding="utf-8", errors="ignore") as f:
+            for data in iter(lambda: f.read(64 * 1024), ""):
+                parser.feed(data)
+                yield from parser.pop_paragraphs()
+
+        parser.close()
+        yield from parser.pop_paragraphs()
+
+    @staticmethod
+    def _docx_paragraphs(file_path: Path) -> Iterator[str]:
+        """
+        Paragraphs of word/document.xml, parsed incrementally.
+        """
+        with zipfile.ZipFile(file_path) as archive:
+            with archive.open("word/document.xml") as xml:
+                for _, element in ElementTree.iterparse(xml, events=("end",)):
+                    if element.tag != f"{WORD_NS}p":
+                        continue
+
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == f"{WORD_NS}t" and node.text:
+                            parts.append(node.text)
+                        elif node.tag == f"{WORD_NS}tab":
+                            parts.append("\t")
+                        elif node.tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                            parts.append("\n")
+
+                    # Release the parsed paragraph
+                    element.clear()
+                    yield "".join(parts)
+
+
+class _HTMLTextParser(HTMLParser):
+    """
+    Collects visible text, breaking paragraphs at block-level tags.
+    """
+
+    SKIP_TAGS = {"script", "style", "noscript", "template", "head"}
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "tr", "table", "section", "article",
+        "header", "footer", "blockquote", "pre", "title",
+        "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._current: List[str] = []
+        self._paragraphs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._break()
+
+    def pop_paragraphs(self) -> List[str]:
+        paragraphs, self._paragraphs = self._paragraphs, []
+        return paragraphs
+
+    def _break(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            self._paragraphs.append(text)
+        self._current = []
@@ -1,13 +1,13 @@
 # rag/generator.py
 
-from openai import OpenAI
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from clients.factory import get_client
+from config.settings import OPENAI_MODEL
 from config.prompts import GENERATOR_SYSTEM_PROMPT, SUMMARY_SYSTEM_PROMPT
 
 
 class GeneratorAgent:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_client("openai")
 
     def generate(self, question: str, documents: list, mode: str = "qa"):
         context = "\n\n".join(d["text"] for d in documents)
@@ -1,21 +1,71 @@
 # rag/retriever.py
 
+import dataclasses
+from typing import Dict, Optional, Union
+
+from embeddings.scope import RetrievalScope
 from embeddings.vector_store import VectorStore
-from config.settings import TOP_K_RETRIEVAL
+from ingestion.dedupe import ChunkDeduplicator
+from config.settings import DEDUPE_ENABLED, TOP_K_RETRIEVAL
 
 
 class RetrieverAgent:
-    def __init__(self):
+    def __init__(self, dedupe: bool = DEDUPE_ENABLED):
         self.vector_store = VectorStore()
+        self._tenant_stores: Dict[str, VectorStore] = {}
+        self.deduplicator = ChunkDeduplicator() if dedupe else None
 
-    def retrieve(self, query: str, mode: str = "qa"):
+    def retrieve(
+        self,
+        query: str,
+        mode: str = "qa",
+        scope: Union[RetrievalScope, Dict, None] = None,
+    ):
         """
         mode:
           - qa: retrieve top-k relevant chunks
           - summary: retrieve many representative chunks
+
+        scope: optional tenant / documents / sources restriction
         """
+        scope = self._with_references(RetrievalScope.from_value(scope))
+        vector_store = self._store(scope.tenant)
+
         if mode == "summary":
             # Pull more context for summaries
-            return self.vector_store.retrieve(query, k=20)
+            return vector_store.retrieve(query, k=20, scope=scope)
+
+        return vector_store.retrieve(query, k=TOP_K_RETRIEVAL, scope=scope)
+
+    def documents(self, scope: Union[RetrievalScope, Dict, None] = None):
+        """
+        (tenant, document) pairs stored within `scope`, including documents
+        whose chunks were all stored as duplicates of other documents.
+        """
+        scope = RetrievalScope.from_value(scope)
+        documents = self._store(scope.tenant).documents(scope)
+
+        if self.deduplicator is not None:
+            documents |= self.deduplicator.documents(scope)
+        return documents
+
+    def _with_references(self, scope: RetrievalScope) -> RetrievalScope:
+        """
+        Extend a documents/sources scope with the stored chunks that its
+        skipped duplicate chunks refer to.
+        """
+        if self.deduplicator is None or not (scope.documents or scope.sources):
+            return scope
+
+        kept_ids = self.deduplicator.kept_ids(scope)
+        if not kept_ids:
+            return scope
+        return dataclasses.replace(scope, chunk_ids=frozenset(kept_ids))
+
+    def _store(self, tenant: Optional[str]) -> VectorStore:
+        if tenant is None:
+            return self.vector_store
 
-        return self.vector_store.retrieve(query, k=TOP_K_RETRIEVAL)
+        if tenant not in self._tenant_stores:
+            self._tenant_stores[tenant] = VectorStore(tenant=tenant)
+        return self._tenant_stores[tenant]
@@ -0,0 +1,238 @@
+# rag/summarizer.py
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import xxhash
+
+from clients.factory import get_client
+from config.settings import (
+    SUMMARY_DIR,
+    SUMMARY_MODEL,
+    SUMMARY_SECTION_CHARS,
+    SUMMARY_FANIN,
+    SUMMARY_MAX_CONCURRENCY,
+)
+from config.prompts import SECTION_SUMMARY_PROMPT, COMBINE_SUMMARY_PROMPT
+
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentSummarizer:
+    """
+    Builds hierarchical (map-reduce) document summaries at ingest time.
+
+    Map: consecutive chunks are grouped into sections of about
+    SUMMARY_SECTION_CHARS characters and each section is summarized.
+    Reduce: section summaries are merged SUMMARY_FANIN at a time, level by
+    level, until a single document summary remains.
+    """
+
+    # Shared by all instances so concurrent ingestions respect one limit
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self):
+        self.client = get_client("openai")
+
+        with DocumentSummarizer._executor_lock:
+            if DocumentSummarizer._executor is None:
+                DocumentSummarizer._executor = ThreadPoolExecutor(
+                    max_workers=SUMMARY_MAX_CONCURRENCY,
+                    thread_name_prefix="summarizer",
+                )
+
+        self._executor = DocumentSummarizer._executor
+
+    def start(self, previous: Optional[dict] = None) -> "SummaryJob":
+        """
+        Begin summarizing a document whose chunk texts are fed to the
+        returned job. Sections unchanged since `previous` (the document's
+        stored summary record) are not summarized again.
+        """
+        return SummaryJob(self, previous)
+
+    def summarize(self, texts: Iterable[str], previous: Optional[dict] = None):
+        job = self.start(previous)
+        for text in texts:
+            job.add(text)
+        return job.finish()
+
+    def _summarize_section(self, text: str) -> str:
+        return self._complete(SECTION_SUMMARY_PROMPT, text)
+
+    def _combine(self, summaries: List[str]) -> str:
+        if len(summaries) == 1:
+            return summaries[0]
+
+        content = "\n\n".join(
+            f"Section {idx}:\n{summary}"
+            for idx, summary in enumerate(summaries, start=1)
+        )
+        return self._complete(COMBINE_SUMMARY_PROMPT, content)
+
+    def merge(self, summaries: List[str], target: int = 1) -> List[str]:
+        """
+        Merge summaries SUMMARY_FANIN at a time, level by level, until at
+        most `target` remain.
+        """
+        while len(summaries) > max(1, target):
+            groups = [
+                summaries[start:start + SUMMARY_FANIN]
+                for start in range(0, len(summaries), SUMMARY_FANIN)
+            ]
+            summaries = list(self._executor.map(self._combine, groups))
+
+        return summaries
+
+    def _reduce(self, summaries: List[str]) -> str:
+        return self.merge(summaries)[0]
+
+    def _complete(self, system_prompt: str, content: str) -> str:
+        response = self.client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            temperature=0.2,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content},
+            ],
+        )
+        return response.choices[0].message.content.strip()
+
+
+class SummaryJob:
+    """
+    Summary of one document in progress. Each section is submitted for
+    summarization as soon as enough chunk text has arrived, so the map
+    step overlaps with embedding and storage.
+    """
+
+    def __init__(self, summarizer: DocumentSummarizer, previous: Optional[dict]):
+        self._summarizer = summarizer
+        self._reusable = {
+            section["hash"]: section["summary"]
+            for section in (previous or {}).get("sections", [])
+        }
+
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._sections: List[tuple] = []  # (section hash, future)
+        self.reused = 0
+
+    def add(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered_chars += len(text)
+
+        if self._buffered_chars >= SUMMARY_SECTION_CHARS:
+            self._flush()
+
+    def tap(self, chunks: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Pass chunks through unchanged while feeding their text to the job.
+        """
+        for chunk in chunks:
+            self.add(chunk["text"])
+            yield chunk
+
+    def finish(self) -> Optional[dict]:
+        """
+        Wait for the section summaries and merge them. Returns the summary
+        record, or None if no text was added.
+        """
+        self._flush()
+        if not self._sections:
+            return None
+
+        sections = [
+            {"hash": section_hash, "summary": future.result()}
+            for section_hash, future in self._sections
+        ]
+        summary = self._summarizer._reduce(
+            [section["summary"] for section in sections]
+        )
+
+        return {
+            "summary": summary,
+            "sections": sections,
+            "model": SUMMARY_MODEL,
+            "created_at": time.time(),
+        }
+
+    def cancel(self) -> None:
+        for _, future in self._sections:
+            future.cancel()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+
+        text = "\n\n".join(self._buffer)
+        self._buffer = []
+        self._buffered_chars = 0
+
+        section_hash = xxhash.xxh3_64_hexdigest(text.encode("utf-8"))
+
+        if section_hash in self._reusable:
+            future = Future()
+            future.set_result(self._reusable[section_hash])
+            self.reused += 1
+        else:
+            future = self._summarizer._executor.submit(
+                self._summarizer._summarize_section, text
+            )
+
+        self._sections.append((section_hash, future))
+
+
+class SummaryStore:
+    """
+    Stored document summaries: one JSON file per document, under
+    SUMMARY_DIR for untenanted documents and SUMMARY_DIR/tenants/<tenant>
+    otherwise.
+    """
+
+    def __init__(self, path: Path = SUMMARY_DIR):
+        self.path = Path(path)
+
+    def get(self, document: str, tenant: Optional[str] = None) -> Optional[dict]:
+        path = self._path(document, tenant)
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning("Ignoring unreadable summary file %s", path)
+            return None
+
+    def save(self, document: str, record: dict, tenant: Optional[str] = None):
+        path = self._path(document, tenant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so readers never see a partial file
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {"document": document, "tenant": tenant, **record}, indent=2
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+    def delete(self, document: str, tenant: Optional[str] = None) -> None:
+        self._path(document, tenant).unlink(missing_ok=True)
+
+    def _directory(self, tenant: Optional[str]) -> Path:
+        if tenant is None:
+            return self.path
+        return self.path / "tenants" / re.sub(r"[^A-Za-z0-9_.-]", "-", tenant)
+
+    def _path(self, document: str, tenant: Optional[str]) -> Path:
+        return self._directory(tenant) / f"{Path(document).name}.json"
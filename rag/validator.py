@@ -3,9 +3,8 @@
 import json
 from typing import List, Dict
 
-from openai import OpenAI
-
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from clients.factory import get_client
+from config.settings import OPENAI_MODEL
 from config.prompts import VALIDATOR_SYSTEM_PROMPT
 
 
@@ -16,7 +15,7 @@ class ValidatorAgent:
     """
 
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_client("openai")
 
     def validate(
         self,
@@ -1,9 +1,17 @@
 # services/chat_service.py
 
+import logging
+from typing import Dict, Optional
+
 from services.intent_service import IntentService
 from rag.retriever import RetrieverAgent
 from rag.generator import GeneratorAgent
+from rag.summarizer import DocumentSummarizer, SummaryStore
 from graph.workflow import run_workflow
+from config.settings import SUMMARY_FANIN, SUMMARY_ROLLUP_MAX_DOCUMENTS
+
+
+logger = logging.getLogger(__name__)
 
 
 SUMMARY_KEYWORDS = {
@@ -21,13 +29,27 @@ class ChatService:
         self.intent_service = IntentService()
         self.retriever = RetrieverAgent()
         self.generator = GeneratorAgent()
+        self.summaries = SummaryStore()
+        self.summarizer = DocumentSummarizer()
 
-    def chat(self, question: str) -> dict:
+    def chat(self, question: str, scope: Optional[Dict] = None) -> dict:
+        """
+        `scope` restricts retrieval by tenant, documents or sources,
+        e.g. {"tenant": "acme", "documents": ["report.pdf"]}.
+        """
         q_lower = question.lower().strip()
 
         # 🔒 HARD SUMMARY ROUTE (cannot fail)
         if any(key in q_lower for key in SUMMARY_KEYWORDS):
-            docs = self.retriever.retrieve(question, mode="summary")
+            answer = self._stored_summary(question, scope)
+            if answer is not None:
+                return {
+                    "status": "success",
+                    "answer": answer,
+                }
+
+            # No stored summary for some document in scope
+            docs = self.retriever.retrieve(question, mode="summary", scope=scope)
             result = self.generator.generate(
                 question=question,
                 documents=docs,
@@ -51,8 +73,56 @@ class ChatService:
             }
 
         # Default → strict agentic RAG
-        answer = run_workflow(question)
+        answer = run_workflow(question, scope=scope)
         return {
             "status": "success",
             "answer": answer,
         }
+
+    def _stored_summary(self, question: str, scope: Optional[Dict]):
+        """
+        Answer a summary question from the summaries built at ingest time:
+        a single document's summary is returned as is, several are rolled
+        up in one generation call (merged SUMMARY_FANIN at a time first when
+        there are more). Returns None unless every document with chunks in
+        scope has a stored summary, or when there are more than
+        SUMMARY_ROLLUP_MAX_DOCUMENTS of them.
+        """
+        # Documents come from the stored chunks, not from the summaries, so
+        # documents without a summary are noticed
+        documents = sorted(
+            self.retriever.documents(scope),
+            key=lambda pair: (pair[0] or "", pair[1] or ""),
+        )
+
+        if len(documents) > SUMMARY_ROLLUP_MAX_DOCUMENTS:
+            logger.info(
+                "%d documents in scope, answering the summary question "
+                "from retrieval",
+                len(documents),
+            )
+            return None
+
+        records = [
+            None if document is None else self.summaries.get(document, tenant)
+            for tenant, document in documents
+        ]
+
+        if not records or any(record is None for record in records):
+            return None
+
+        if len(records) == 1:
+            return records[0]["summary"]
+
+        # Keep the final call within the model's context
+        summaries = self.summarizer.merge(
+            [f"{record['document']}:\n{record['summary']}" for record in records],
+            target=SUMMARY_FANIN,
+        )
+
+        result = self.generator.generate(
+            question=question,
+            documents=[{"text": summary} for summary in summaries],
+            mode="summary",
+        )
+        return result["answer"]
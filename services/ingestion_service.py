@@ -1,28 +1,72 @@
 # services/ingestion_service.py
 
+import logging
+import queue
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Union, BinaryIO
+from typing import Iterable, Iterator, List, Optional, Union, BinaryIO
 
 from ingestion.loader import DocumentLoader
+from ingestion.manifest import IngestionManifest
 from ingestion.ocr import DeepSeekOCR
 from ingestion.text_cleaner import TextCleaner
 from ingestion.chunker import TextChunker
-from embeddings.vector_store import VectorStore
+from ingestion.dedupe import ChunkDeduplicator
+from embeddings.vector_store import ProgressCallback, VectorStore
+from rag.summarizer import DocumentSummarizer, SummaryJob, SummaryStore
+from config.settings import (
+    DEDUPE_ENABLED,
+    INGEST_QUEUE_SIZE,
+    INGEST_STREAMING,
+    INGEST_STREAM_BATCH_SIZE,
+    INGEST_WRITE_INTERMEDIATE,
+    OCR_DATA_DIR,
+    PROCESSED_DATA_DIR,
+    SUMMARIES_ENABLED,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input on a pipeline queue
+_DONE = object()
 
 
 class IngestionService:
     """
     Orchestrates end-to-end document ingestion.
+
+    Documents are ingested for `tenant` (None for untenanted data); every
+    chunk records the tenant and the uploaded file name ("document") so
+    retrieval can be scoped to them.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        streaming: bool = INGEST_STREAMING,
+        dedupe: bool = DEDUPE_ENABLED,
+        tenant: Optional[str] = None,
+        summarize: bool = SUMMARIES_ENABLED,
+    ):
+        self.streaming = streaming
+        self.tenant = tenant
         self.loader = DocumentLoader()
         self.ocr = DeepSeekOCR()
         self.cleaner = TextCleaner()
         self.chunker = TextChunker()
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(tenant=tenant)
+        self.manifest = IngestionManifest()
+        self.deduplicator = ChunkDeduplicator() if dedupe else None
+        self.summarizer = DocumentSummarizer() if summarize else None
+        self.summaries = SummaryStore()
 
-    def ingest(self, file: Union[str, Path, BinaryIO]) -> dict:
+    def ingest(
+        self,
+        file: Union[str, Path, BinaryIO],
+        progress: Optional[ProgressCallback] = None,
+    ) -> dict:
         """
         Ingest a document into the RAG system.
 
@@ -30,33 +74,463 @@ class IngestionService:
         1. Load raw file
         2. OCR extraction
         3. Text cleaning
-        4. Chunking
-        5. Embedding + storage
+        4. Chunking (and near-duplicate suppression, if enabled)
+        5. Embedding + storage (only new or changed chunks)
+        6. Document summary (sections are summarized during step 5)
+
+        Files whose content hash matches the manifest are skipped.
+        `progress` is called as chunks are written to the vector store.
 
         Returns a summary dict for UI or logging.
         """
+        if self.streaming:
+            return self.ingest_stream(file, progress=progress)
+
         # 1. Load raw document
-        raw_path = self.loader.load(file)
+        raw_path, file_hash = self.loader.load_with_hash(file)
+
+        if self.manifest.is_unchanged(self._manifest_key(raw_path), file_hash):
+            return self._skipped(raw_path)
 
         # 2. OCR
         ocr_text_path = self.ocr.run(raw_path)
 
-        # 3. Clean text
-        cleaned_text_path = self.cleaner.clean(ocr_text_path)
+        # 3-4. Clean and chunk text
+        cleaned_text_path, chunks, duplicates, summary_job = (
+            self._clean_and_chunk(raw_path, ocr_text_path)
+        )
+
+        # 5-6. Store embeddings and summary
+        sync_stats = self._store(
+            raw_path, file_hash, cleaned_text_path, chunks, progress, summary_job
+        )
+        self._save_summary(raw_path, file_hash, cleaned_text_path, summary_job)
+
+        return self._result(
+            raw_path,
+            ocr_text_path,
+            cleaned_text_path,
+            chunks,
+            sync_stats,
+            duplicates,
+        )
+
+    def ingest_stream(
+        self,
+        file: Union[str, Path, BinaryIO],
+        write_intermediate: bool = INGEST_WRITE_INTERMEDIATE,
+        progress: Optional[ProgressCallback] = None,
+    ) -> dict:
+        """
+        Ingest a document with pages streaming through every stage.
+
+        Pages are cleaned and chunked as soon as they are extracted, and
+        chunks are embedded in batches while later pages are still being
+        OCR'd. Nothing is written to data/ocr or data/processed unless
+        `write_intermediate` is set.
+        """
+        raw_path, file_hash = self.loader.load_with_hash(file)
+
+        if self.manifest.is_unchanged(self._manifest_key(raw_path), file_hash):
+            return self._skipped(raw_path)
+
+        # Same source key as the file-based path, so both stay in sync
+        ocr_text_path = OCR_DATA_DIR / f"{raw_path.stem}.txt"
+        cleaned_text_path = PROCESSED_DATA_DIR / f"{raw_path.stem}.txt"
+
+        pages = self.ocr.iter_pages(raw_path)
+        if write_intermediate:
+            pages = self._tee_to_file(pages, ocr_text_path)
+
+        cleaned = self.cleaner.clean_pages(pages)
+        if write_intermediate:
+            cleaned = self._tee_to_file(cleaned, cleaned_text_path)
+
+        chunks = self.chunker.iter_chunks(
+            cleaned,
+            source=str(cleaned_text_path),
+            metadata={"document": raw_path.name},
+        )
+
+        # Summarize everything, including chunks dropped as duplicates below
+        summary_job = self._start_summary(raw_path)
+        if summary_job is not None:
+            chunks = summary_job.tap(chunks)
+
+        dedupe_counts = Counter()
+        if self.deduplicator is not None:
+            self._forget_dedupe_source(cleaned_text_path)
+            chunks = self.deduplicator.dedupe(
+                chunks, str(cleaned_text_path), dedupe_counts, self.tenant
+            )
+
+        try:
+            sync_stats = self.vector_store.sync_documents(
+                chunks,
+                source=str(cleaned_text_path),
+                batch_size=INGEST_STREAM_BATCH_SIZE,
+                progress=progress,
+            )
+
+            if not sync_stats["total"]:
+                if not dedupe_counts["duplicates"]:
+                    raise ValueError("No text chunks generated from document.")
+
+                # Every chunk was a duplicate: drop the previous version
+                sync_stats = self.vector_store.sync_documents(
+                    [], source=str(cleaned_text_path), allow_empty=True
+                )
+        except Exception:
+            if summary_job is not None:
+                summary_job.cancel()
+            raise
+
+        self.manifest.record(
+            self._manifest_key(raw_path),
+            file_hash,
+            num_chunks=sync_stats["total"],
+            source=str(cleaned_text_path),
+        )
+        self._save_summary(raw_path, file_hash, cleaned_text_path, summary_job)
+
+        return {
+            "status": "success",
+            "source_file": str(raw_path),
+            "ocr_text_file": str(ocr_text_path) if write_intermediate else None,
+            "processed_text_file": (
+                str(cleaned_text_path) if write_intermediate else None
+            ),
+            "num_chunks": sync_stats["total"],
+            "chunks_added": sync_stats["added"],
+            "chunks_deleted": sync_stats["deleted"],
+            "duplicates_skipped": dedupe_counts["duplicates"],
+        }
+
+    def ingest_many(self, files: Iterable[Union[str, Path, BinaryIO]]) -> dict:
+        """
+        Ingest many documents with the stages running as a pipeline.
+
+        Load + OCR, clean + chunk, and embed + store each run in their own
+        thread, connected by bounded queues, so document N+1 can be OCR'd
+        while document N is being embedded. Summaries are finished and
+        saved in a fourth stage, so storing never waits for them. A failing
+        document is reported in its result entry and does not stop the
+        batch.
+
+        Returns per-document results (in input order) and aggregate
+        throughput.
+        """
+        files = list(files)
+        results: List[dict] = [{} for _ in files]
+
+        ocr_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        store_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        # Unbounded: the sections are already queued on the summarizer
+        summary_queue = queue.Queue()
+
+        def extract_stage():
+            for idx, file in enumerate(files):
+                try:
+                    raw_path, file_hash = self.loader.load_with_hash(file)
+
+                    if self.manifest.is_unchanged(
+                        self._manifest_key(raw_path), file_hash
+                    ):
+                        results[idx] = self._skipped(raw_path)
+                        continue
+
+                    ocr_text_path = self.ocr.run(raw_path)
+                    ocr_queue.put((idx, raw_path, file_hash, ocr_text_path))
+                except Exception as e:
+                    results[idx] = self._error(file, e)
+            ocr_queue.put(_DONE)
+
+        def chunk_stage():
+            while (item := ocr_queue.get()) is not _DONE:
+                idx, raw_path, file_hash, ocr_text_path = item
+                try:
+                    cleaned_text_path, chunks, duplicates, summary_job = (
+                        self._clean_and_chunk(raw_path, ocr_text_path)
+                    )
+                    store_queue.put(
+                        (
+                            idx,
+                            raw_path,
+                            file_hash,
+                            ocr_text_path,
+                            cleaned_text_path,
+                            chunks,
+                            duplicates,
+                            summary_job,
+                        )
+                    )
+                except Exception as e:
+                    results[idx] = self._error(raw_path, e)
+            store_queue.put(_DONE)
+
+        def store_stage():
+            while (item := store_queue.get()) is not _DONE:
+                (
+                    idx,
+                    raw_path,
+                    file_hash,
+                    ocr_text_path,
+                    cleaned_text_path,
+                    chunks,
+                    duplicates,
+                    summary_job,
+                ) = item
+                try:
+                    sync_stats = self._store(
+                        raw_path,
+                        file_hash,
+                        cleaned_text_path,
+                        chunks,
+                        summary_job=summary_job,
+                    )
+                    results[idx] = self._result(
+                        raw_path,
+                        ocr_text_path,
+                        cleaned_text_path,
+                        chunks,
+                        sync_stats,
+                        duplicates,
+                    )
+                except Exception as e:
+                    results[idx] = self._error(raw_path, e)
+                    continue
+
+                if summary_job is not None:
+                    summary_queue.put(
+                        (raw_path, file_hash, cleaned_text_path, summary_job)
+                    )
+            summary_queue.put(_DONE)
 
-        # 4. Chunk text
-        chunks = self.chunker.chunk(cleaned_text_path)
+        def summary_stage():
+            while (item := summary_queue.get()) is not _DONE:
+                self._save_summary(*item)
+
+        start = time.perf_counter()
+
+        threads = [
+            threading.Thread(target=stage, name=f"ingest-{stage.__name__}")
+            for stage in (extract_stage, chunk_stage, store_stage, summary_stage)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+
+        succeeded = [r for r in results if r.get("status") == "success"]
+        skipped = [r for r in results if r.get("status") == "skipped"]
+        num_chunks = sum(r["num_chunks"] for r in succeeded)
+
+        return {
+            "results": results,
+            "num_documents": len(files),
+            "num_succeeded": len(succeeded),
+            "num_skipped": len(skipped),
+            "num_failed": len(files) - len(succeeded) - len(skipped),
+            "num_chunks": num_chunks,
+            "elapsed_seconds": elapsed,
+            "documents_per_second": len(succeeded) / elapsed if elapsed else 0.0,
+            "chunks_per_second": num_chunks / elapsed if elapsed else 0.0,
+        }
+
+    def _clean_and_chunk(self, raw_path: Path, ocr_text_path: Path):
+        """
+        Returns the cleaned text path, the chunks to store, the number of
+        near-duplicate chunks that were skipped, and the document's summary
+        job (None when summaries are disabled).
+        """
+        cleaned_text_path = self.cleaner.clean(ocr_text_path)
+        chunks = self.chunker.chunk(
+            cleaned_text_path, metadata={"document": raw_path.name}
+        )
 
         if not chunks:
             raise ValueError("No text chunks generated from document.")
 
-        # 5. Store embeddings
-        self.vector_store.add_documents(chunks)
+        # Sections are summarized in the background while chunks are stored
+        summary_job = self._start_summary(raw_path)
+        if summary_job is not None:
+            for chunk in chunks:
+                summary_job.add(chunk["text"])
+
+        dedupe_counts = Counter()
+        if self.deduplicator is not None:
+            self._forget_dedupe_source(cleaned_text_path)
+            chunks = list(
+                self.deduplicator.dedupe(
+                    chunks, str(cleaned_text_path), dedupe_counts, self.tenant
+                )
+            )
+
+        return cleaned_text_path, chunks, dedupe_counts["duplicates"], summary_job
+
+    def _forget_dedupe_source(self, cleaned_text_path: Path) -> None:
+        """
+        Drop the previous version of a source from the dedupe index.
+
+        Files whose chunks were skipped as duplicates of its chunks lose
+        those references, so their manifest entries are invalidated: they
+        are ingested again (storing their own copies) next time, even
+        though their content is unchanged.
+        """
+        affected = set(
+            self.deduplicator.forget_source(str(cleaned_text_path), self.tenant)
+        )
+        if not affected:
+            return
+
+        prefix = "" if self.tenant is None else f"{self.tenant}/"
+        keys = []
+        for key, entry in self.manifest.items():
+            name = key[len(prefix):]
+            if not key.startswith(prefix) or "/" in name:
+                continue
+
+            # Entries recorded before sources were stored
+            source = entry.get(
+                "source", str(PROCESSED_DATA_DIR / f"{Path(name).stem}.txt")
+            )
+            if source in affected:
+                keys.append(key)
+
+        self.manifest.invalidate(keys)
+        logger.warning(
+            "%s changed; re-ingest %s to restore chunks that were only stored "
+            "as duplicates of it (their manifest entries were cleared)",
+            cleaned_text_path.name,
+            sorted(keys),
+        )
+
+    @staticmethod
+    def _tee_to_file(pages: Iterable[str], output_path: Path) -> Iterator[str]:
+        """
+        Pass pages through unchanged while writing them to output_path.
+        """
+        with open(output_path, "w", encoding="utf-8") as f:
+            for idx, page in enumerate(pages):
+                if idx:
+                    f.write("\n\n")
+                f.write(page)
+                yield page
+
+    def _store(
+        self,
+        raw_path: Path,
+        file_hash: str,
+        cleaned_text_path: Path,
+        chunks,
+        progress: Optional[ProgressCallback] = None,
+        summary_job: Optional[SummaryJob] = None,
+    ) -> dict:
+        """
+        Sync chunks into the vector store and record the file as ingested.
+        The summary job is cancelled if the sync fails; saving the summary
+        is left to the caller.
+        """
+        try:
+            # Chunks may all have been dropped as duplicates; the previous
+            # version of the source must still be replaced
+            sync_stats = self.vector_store.sync_documents(
+                chunks,
+                source=str(cleaned_text_path),
+                progress=progress,
+                allow_empty=True,
+            )
+        except Exception:
+            if summary_job is not None:
+                summary_job.cancel()
+            raise
+
+        self.manifest.record(
+            self._manifest_key(raw_path),
+            file_hash,
+            num_chunks=len(chunks),
+            source=str(cleaned_text_path),
+        )
+        return sync_stats
+
+    def _start_summary(self, raw_path: Path) -> Optional[SummaryJob]:
+        if self.summarizer is None:
+            return None
+        previous = self.summaries.get(raw_path.name, self.tenant)
+        return self.summarizer.start(previous)
+
+    def _save_summary(
+        self,
+        raw_path: Path,
+        file_hash: str,
+        cleaned_text_path: Path,
+        summary_job: Optional[SummaryJob],
+    ) -> None:
+        """
+        Finish and store the document summary. A failed summary is logged
+        and the old one removed, so summary questions fall back to
+        retrieval instead of a stale answer; ingestion itself succeeds.
+        """
+        if summary_job is None:
+            return
+
+        try:
+            record = summary_job.finish()
+        except Exception:
+            logger.exception("Summarizing %s failed", raw_path.name)
+            self.summaries.delete(raw_path.name, self.tenant)
+            return
 
+        if record is None:
+            return
+
+        self.summaries.save(
+            raw_path.name,
+            {**record, "source": str(cleaned_text_path), "file_hash": file_hash},
+            self.tenant,
+        )
+        logger.info(
+            "Summarized %s: %d sections (%d reused)",
+            raw_path.name,
+            len(record["sections"]),
+            summary_job.reused,
+        )
+
+    @staticmethod
+    def _result(
+        raw_path, ocr_text_path, cleaned_text_path, chunks, sync_stats, duplicates=0
+    ) -> dict:
         return {
             "status": "success",
             "source_file": str(raw_path),
             "ocr_text_file": str(ocr_text_path),
             "processed_text_file": str(cleaned_text_path),
             "num_chunks": len(chunks),
+            "chunks_added": sync_stats["added"],
+            "chunks_deleted": sync_stats["deleted"],
+            "duplicates_skipped": duplicates,
+        }
+
+    def _manifest_key(self, raw_path: Path) -> str:
+        if self.tenant is None:
+            return raw_path.name
+        return f"{self.tenant}/{raw_path.name}"
+
+    def _skipped(self, raw_path: Path) -> dict:
+        entry = self.manifest.get(self._manifest_key(raw_path)) or {}
+        return {
+            "status": "skipped",
+            "source_file": str(raw_path),
+            "reason": "File unchanged since last ingestion.",
+            "num_chunks": entry.get("num_chunks", 0),
+        }
+
+    @staticmethod
+    def _error(file, error: Exception) -> dict:
+        return {
+            "status": "error",
+            "source_file": str(getattr(file, "name", file)),
+            "error": str(error),
         }
@@ -1,14 +1,14 @@
 # services/intent_service.py
 
 import json
-from openai import OpenAI
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL
+from clients.factory import get_client
+from config.settings import OPENAI_MODEL
 from config.prompts import INTENT_CLASSIFIER_PROMPT
 
 
 class IntentService:
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_client("openai")
 
     def classify(self, question: str) -> dict:
         response = self.client.chat.completions.create(
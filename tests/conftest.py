@@ -0,0 +1,11 @@
+# tests/conftest.py
+
+import os
+import sys
+from pathlib import Path
+
+# config.settings requires API keys at import; tests never call the APIs
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DEEPSEEK_API_KEY", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
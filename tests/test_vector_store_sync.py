@@ -0,0 +1,107 @@
+# tests/test_vector_store_sync.py
+
+import hashlib
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import embeddings.vector_store as vector_store
+from embeddings.backends import EmbeddingBackend
+from embeddings.cache import QueryEmbeddingCache
+from embeddings.embedder import Embedder
+from embeddings.vector_store import VectorStore
+from ingestion.dedupe import ChunkDeduplicator
+
+
+class HashEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic embeddings derived from the text hash, without API calls.
+    """
+
+    model_name = "test-hash"
+
+    def embed(self, texts):
+        return np.array(
+            [
+                np.frombuffer(hashlib.sha256(t.encode("utf-8")).digest(), np.uint8)
+                for t in texts
+            ],
+            dtype=np.float32,
+        )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "CHROMA_DIR", tmp_path / "chroma")
+    monkeypatch.setattr(
+        vector_store, "LEXICAL_INDEX_PATH", tmp_path / "lexical_index.sqlite3"
+    )
+    monkeypatch.setattr(VectorStore, "_client", None)
+    monkeypatch.setattr(VectorStore, "_partitions", {})
+
+    monkeypatch.setattr(Embedder, "_backend", HashEmbeddingBackend())
+    monkeypatch.setattr(Embedder, "_cache", None)
+    monkeypatch.setattr(Embedder, "_query_cache", QueryEmbeddingCache())
+
+    return VectorStore()
+
+
+def make_chunks(source, paragraphs):
+    return [
+        {
+            "text": text,
+            "metadata": {"source": source, "document": source, "chunk_index": idx},
+        }
+        for idx, text in enumerate(paragraphs)
+    ]
+
+
+def stored_ids(store, source):
+    return store._collection.get(where={"source": source})["ids"]
+
+
+ORIGINAL = [
+    f"paragraph {i} of the original report covers topic {i} in detail"
+    for i in range(5)
+]
+SHARED = [
+    f"section {i} of the shared appendix repeats clause {i} word for word"
+    for i in range(5)
+]
+
+
+def test_empty_sync_keeps_source(store):
+    store.sync_documents(make_chunks("b.txt", ORIGINAL))
+
+    stats = store.sync_documents([], source="b.txt")
+
+    assert stats["deleted"] == 0
+    assert len(stored_ids(store, "b.txt")) == len(ORIGINAL)
+
+
+def test_fully_deduplicated_version_replaces_source(store, tmp_path):
+    deduplicator = ChunkDeduplicator(path=tmp_path / "dedupe.sqlite3")
+
+    def ingest(source, paragraphs):
+        counts = Counter()
+        chunks = list(
+            deduplicator.dedupe(make_chunks(source, paragraphs), source, counts)
+        )
+        return store.sync_documents(chunks, source=source, allow_empty=True), counts
+
+    ingest("a.txt", SHARED)
+    ingest("b.txt", ORIGINAL)
+
+    # b.txt now only contains text already stored for a.txt
+    stats, counts = ingest("b.txt", SHARED)
+
+    assert counts["duplicates"] == len(SHARED)
+    assert stats["total"] == 0
+    assert stats["deleted"] == len(ORIGINAL)
+    assert stored_ids(store, "b.txt") == []
+    assert len(store._lexical_index) == len(SHARED)
+    assert all(
+        hit["metadata"]["source"] == "a.txt"
+        for hit in store.retrieve("original report topic", mode="lexical")
+    )